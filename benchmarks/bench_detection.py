@@ -0,0 +1,154 @@
+"""
+WebDriver round-trips and wall time of login field detection.
+
+Compares the original detection, which probed the page with one
+find_elements call per pattern, against login_detection, which scores
+every candidate in one execute_script call. Fixture pages are served
+from a local HTTP server and each is detected --runs times with both.
+Needs Chrome.
+
+    python benchmarks/bench_detection.py [--runs 20]
+"""
+import argparse
+import functools
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from selenium.webdriver.common.by import By
+from driver_pool import DriverPool
+from login_detection import detect_login_fields
+
+FORM = """<!DOCTYPE html><html><head><title>{title}</title></head><body>
+{filler}
+<form>{fields}<button type="submit" class="btn">Continue</button></form>
+</body></html>"""
+
+FIXTURES = {
+    # Matched by the first patterns the old code tried
+    "simple.html": FORM.format(
+        title="Simple", filler="",
+        fields='<input type="email" id="email"><input type="password" id="password">'),
+    # Username only matched near the end of the old pattern list
+    "late_match.html": FORM.format(
+        title="Late match", filler="",
+        fields='<input type="text" id="f1" name="username-or-email"><input type="password" id="f2">'),
+    # A long page with many unrelated inputs and buttons
+    "busy.html": FORM.format(
+        title="Busy",
+        filler="\n".join(f'<div><input type="text" name="q{i}"><button type="button">Go {i}</button></div>'
+                         for i in range(200)),
+        fields='<input type="text" name="account-name"><input type="password" name="pw">'),
+}
+
+USERNAME_PATTERNS = ['username', 'email', 'login', 'user', 'id', 'phone',
+                     'account', 'loginid', 'userid', 'user-name', 'username-or-email']
+PASSWORD_PATTERNS = ['password', 'pass', 'pwd', 'passwd']
+SUBMIT_PATTERNS = ["//button[@type='submit']", "//input[@type='submit']",
+                   "//button[contains(@class, 'login')]", "//button[contains(@class, 'signin')]",
+                   "//button[contains(text(), 'Log')]", "//button[contains(text(), 'Sign')]"]
+
+
+def legacy_detect(driver):
+    """The find_elements loop WebIntegration.detect_login_fields used to run."""
+    username = None
+    if driver.find_elements(By.XPATH, "//input[@type='email']"):
+        username = {'xpath': "//input[@type='email']"}
+    else:
+        for pattern in USERNAME_PATTERNS:
+            if driver.find_elements(By.ID, pattern):
+                username = {'id': pattern}
+                break
+            if driver.find_elements(By.NAME, pattern):
+                username = {'name': pattern}
+                break
+            xpath = f"//input[contains(@id, '{pattern}') or contains(@name, '{pattern}')]"
+            if driver.find_elements(By.XPATH, xpath):
+                username = {'xpath': xpath}
+                break
+    password = None
+    if driver.find_elements(By.XPATH, "//input[@type='password']"):
+        password = {'xpath': "//input[@type='password']"}
+    else:
+        for pattern in PASSWORD_PATTERNS:
+            xpath = (f"//input[@type='password' and (contains(@id, '{pattern}') "
+                     f"or contains(@name, '{pattern}'))]")
+            if driver.find_elements(By.XPATH, xpath):
+                password = {'xpath': xpath}
+                break
+    submit = None
+    for pattern in SUBMIT_PATTERNS:
+        if driver.find_elements(By.XPATH, pattern):
+            submit = {'xpath': pattern}
+            break
+    return username, password, submit
+
+
+class RoundTrips:
+    """Counts the WebDriver commands a driver sends."""
+
+    def __init__(self, driver):
+        self.count = 0
+        execute = driver.execute
+
+        def counting(*args, **kwargs):
+            self.count += 1
+            return execute(*args, **kwargs)
+
+        driver.execute = counting
+
+
+def serve(directory: str) -> ThreadingHTTPServer:
+    class Handler(SimpleHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(Handler, directory=directory))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def measure(driver, round_trips: RoundTrips, detect, runs: int):
+    """Round-trips per detection and median milliseconds per detection."""
+    timings = []
+    round_trips.count = 0
+    for _ in range(runs):
+        start = time.perf_counter()
+        detect(driver)
+        timings.append(time.perf_counter() - start)
+    return round_trips.count / runs, statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        for name, html in FIXTURES.items():
+            with open(os.path.join(directory, name), "w") as f:
+                f.write(html)
+        server = serve(directory)
+        pool = DriverPool(size=1, warm=False)
+        try:
+            with pool.session() as driver:
+                round_trips = RoundTrips(driver)
+                print(f"{'page':>16}  {'old trips':>9}  {'old ms':>8}  {'new trips':>9}  {'new ms':>8}")
+                for name in FIXTURES:
+                    driver.get(f"http://127.0.0.1:{server.server_address[1]}/{name}")
+                    old_trips, old_ms = measure(driver, round_trips, legacy_detect, args.runs)
+                    new_trips, new_ms = measure(driver, round_trips, detect_login_fields, args.runs)
+                    print(f"{name:>16}  {old_trips:>9.0f}  {old_ms:>8.2f}  {new_trips:>9.0f}  {new_ms:>8.2f}")
+        finally:
+            pool.close()
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Password generation throughput, old retry loop against PasswordGenerator.
+
+The old loop drew every character with secrets.choice and retried until
+PasswordStrengthChecker scored the result 80 or more. PasswordGenerator
+needs no retries and draws its random bytes in bulk.
+
+    python benchmarks/bench_generator.py [--count 20000] [--length 16]
+"""
+import argparse
+import os
+import secrets
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from password_generator import PasswordGenerator, PasswordPolicy
+from password_strength import PasswordStrengthChecker
+
+
+def retry_loop(count: int, length: int) -> list:
+    """The generator PasswordManager.generate_password used to run."""
+    checker = PasswordStrengthChecker()
+    chars = string.ascii_letters + string.digits + "!@#$%^&*"
+    passwords = []
+    while len(passwords) < count:
+        password = ''.join(secrets.choice(chars) for _ in range(length))
+        score, _, _, _ = checker.check_strength(password)
+        if score >= 80:
+            passwords.append(password)
+    return passwords
+
+
+def rate(generate, count: int, length: int) -> float:
+    """Passwords generated per second."""
+    start = time.perf_counter()
+    generate(count, length)
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=20_000)
+    parser.add_argument("--length", type=int, default=16)
+    args = parser.parse_args()
+
+    generator = PasswordGenerator()
+    results = {
+        "retry loop": rate(retry_loop, args.count, args.length),
+        "generate_many": rate(generator.generate_many, args.count, args.length),
+        "generate": rate(lambda count, length: [generator.generate(PasswordPolicy(length=length))
+                                                for _ in range(count)], args.count, args.length),
+    }
+    print(f"{'':>14}  {'passwords/s':>12}")
+    for name, value in results.items():
+        print(f"{name:>14}  {value:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
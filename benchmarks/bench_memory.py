@@ -0,0 +1,86 @@
+"""
+Bytes per PasswordEntry held in memory, before and after slotting.
+
+A vault document is parsed as _load_passwords does, an entry is built
+for every record and the parsed records are dropped. What is still
+allocated then is what the vault costs to keep in password_dict. The
+"before" entry is the original plain dataclass, whose categories are
+per-record strings; the "after" entry is the slotted PasswordEntry with
+interned categories.
+
+    python benchmarks/bench_memory.py [--entries 100000]
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from password_manager_core import PasswordEntry
+
+
+@dataclass
+class DictPasswordEntry:
+    # PasswordEntry as it was before: one __dict__ per instance
+    username: str
+    password: str
+    url: str = ""
+    category: str = "General"
+    created_date: float = 0.0
+    last_modified: float = 0.0
+
+
+def vault_document(count: int) -> str:
+    now = time.time()
+    return json.dumps({
+        f"service-{i}": {
+            "username": f"user{i}@example.com",
+            "password": "",
+            "url": f"https://service-{i}.example.com/login",
+            "category": ("General", "Work", "Banking", "Social", "Shopping")[i % 5],
+            "created_date": now,
+            "last_modified": now,
+        }
+        for i in range(count)
+    })
+
+
+def load(document: str, entry_type, intern: bool) -> int:
+    """Bytes still allocated after building the entries of document."""
+    gc.collect()
+    tracemalloc.start()
+    records = json.loads(document)
+    entries = {}
+    for service, record in records.items():
+        if intern:
+            record["category"] = sys.intern(record["category"])
+        entries[service] = entry_type(**record)
+    del records
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del entries
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--entries", type=int, default=100_000)
+    args = parser.parse_args()
+
+    document = vault_document(args.entries)
+    before = load(document, DictPasswordEntry, intern=False) / args.entries
+    after = load(document, PasswordEntry, intern=True) / args.entries
+    print(f"{'':>8}  {'bytes/entry':>12}")
+    print(f"{'before':>8}  {before:>12.1f}")
+    print(f"{'after':>8}  {after:>12.1f}")
+    print(f"{'saved':>8}  {1 - after / before:>12.1%}")
+
+
+if __name__ == "__main__":
+    main()
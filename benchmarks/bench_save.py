@@ -0,0 +1,62 @@
+"""
+Time PasswordManager saves as the vault grows.
+
+Each vault is seeded in one batch, then single entries are updated and
+every update is timed, including its write to storage. Since only dirty
+entries are encrypted and written, the time per save should stay flat
+from 100 to 100k entries.
+
+    python benchmarks/bench_save.py [--engine json|sqlite] [--saves 50]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cryptography.fernet import Fernet
+from password_manager_core import PasswordEntry, PasswordManager
+
+SIZES = (100, 1_000, 10_000, 100_000)
+
+
+def bench(size: int, engine: str, saves: int) -> float:
+    """Median seconds per single-entry save in a vault of size entries."""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        try:
+            manager = PasswordManager(storage_engine=engine)
+            # The benchmark is about saves, so skip master key derivation
+            manager.fernet = Fernet(Fernet.generate_key())
+            manager._load_passwords()
+            manager.add_entries(
+                (f"service-{i}", PasswordEntry(f"user{i}", f"password-{i}!", category=f"cat{i % 20}"))
+                for i in range(size))
+            timings = []
+            for i in range(saves):
+                start = time.perf_counter()
+                manager.add_password(f"service-{i * 7919 % size}", "someone", f"new-password-{i}")
+                timings.append(time.perf_counter() - start)
+            manager.close()
+        finally:
+            os.chdir(cwd)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--engine", choices=("json", "sqlite"), default="json")
+    parser.add_argument("--saves", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'entries':>10}  {'ms/save':>10}")
+    for size in SIZES:
+        print(f"{size:>10}  {bench(size, args.engine, args.saves) * 1000:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
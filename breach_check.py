@@ -0,0 +1,182 @@
+import hashlib
+import heapq
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from typing import Iterable, Iterator, List
+
+
+class BreachedPasswordChecker:
+    """
+    Offline check of passwords against a local breach corpus.
+
+    The index is a sorted array of binary SHA-1 digests built from a
+    HIBP-style "HASH:count" text dump, followed by a 65536-entry fanout
+    table keyed by the first two bytes of the digest. Lookups memory-map the
+    file and binary search only the fanout bucket, so nothing is loaded
+    into memory and no network access is needed.
+    """
+
+    MAGIC = b"PMBRCH1\n"
+    HEADER = struct.Struct(">8sQ")
+    DIGEST_SIZE = 20
+    FANOUT = struct.Struct(">65537Q")
+
+    def __init__(self, index_file: str = "breached_passwords.bin"):
+        self.index_file = index_file
+        self._file = None
+        self._mmap = None
+        self._fanout = None
+        self.count = 0
+
+    def available(self) -> bool:
+        """Whether a breach index exists and could be opened."""
+        try:
+            self._open()
+            return True
+        except (OSError, ValueError):
+            return False
+
+    def _open(self):
+        if self._mmap is not None:
+            return
+        self._file = open(self.index_file, "rb")
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, self.count = self.HEADER.unpack_from(self._mmap, 0)
+            if magic != self.MAGIC:
+                raise ValueError(f"Not a breach index: {self.index_file}")
+            fanout_offset = self.HEADER.size + self.count * self.DIGEST_SIZE
+            self._fanout = self.FANOUT.unpack_from(self._mmap, fanout_offset)
+        except Exception:
+            self.close()
+            raise
+
+    def _contains(self, digest: bytes) -> bool:
+        prefix = (digest[0] << 8) | digest[1]
+        low, high = self._fanout[prefix], self._fanout[prefix + 1]
+        data, size, base = self._mmap, self.DIGEST_SIZE, self.HEADER.size
+        while low < high:
+            middle = (low + high) // 2
+            offset = base + middle * size
+            candidate = data[offset:offset + size]
+            if candidate < digest:
+                low = middle + 1
+            elif candidate > digest:
+                high = middle
+            else:
+                return True
+        return False
+
+    def is_breached(self, password: str) -> bool:
+        """Check a single password."""
+        return self.check_many([password])[0]
+
+    def check_many(self, passwords: Iterable[str]) -> List[bool]:
+        """
+        Check many passwords, e.g. a whole vault. Lookups are issued in
+        digest order so neighbouring queries touch the same pages.
+        """
+        self._open()
+        digests = [hashlib.sha1(password.encode()).digest() for password in passwords]
+        results = [False] * len(digests)
+        for index in sorted(range(len(digests)), key=digests.__getitem__):
+            results[index] = self._contains(digests[index])
+        return results
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    @classmethod
+    def build_index(cls, source_file: str, index_file: str = "breached_passwords.bin",
+                    run_size: int = 1_000_000) -> int:
+        """
+        Build an index from a text dump with one SHA-1 hex digest per line
+        (an optional ":count" suffix is ignored). Digests are spilled to
+        disk in runs of run_size and merged, so memory stays bounded; runs
+        are only sorted once the dump turns out not to be ordered by hash.
+        Returns the number of distinct digests written.
+        """
+        runs = []
+        run = []
+        in_order = True
+        previous = b""
+        try:
+            for digest in cls._read_digests(source_file):
+                if digest < previous:
+                    in_order = False
+                previous = digest
+                run.append(digest)
+                if len(run) >= run_size:
+                    runs.append(cls._spill(run, in_order))
+                    run = []
+            runs.append(cls._spill(run, in_order))
+            return cls._write_index(heapq.merge(*(cls._read_run(path) for path in runs)), index_file)
+        finally:
+            for path in runs:
+                os.remove(path)
+
+    @staticmethod
+    def _read_digests(source_file: str) -> Iterator[bytes]:
+        with open(source_file, "r") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield bytes.fromhex(line.split(":", 1)[0])
+
+    @classmethod
+    def _spill(cls, run: List[bytes], in_order: bool) -> str:
+        if not in_order:
+            run.sort()
+        fd, path = tempfile.mkstemp(suffix=".run")
+        with os.fdopen(fd, "wb") as f:
+            f.write(b"".join(run))
+        return path
+
+    @classmethod
+    def _read_run(cls, path: str) -> Iterator[bytes]:
+        with open(path, "rb") as f:
+            while True:
+                digest = f.read(cls.DIGEST_SIZE)
+                if len(digest) < cls.DIGEST_SIZE:
+                    return
+                yield digest
+
+    @classmethod
+    def _write_index(cls, digests: Iterator[bytes], index_file: str) -> int:
+        counts = [0] * 65536
+        count = 0
+        previous = None
+        tmp_file = index_file + ".tmp"
+        with open(tmp_file, "wb") as f:
+            f.write(cls.HEADER.pack(cls.MAGIC, 0))
+            for digest in digests:
+                if digest == previous:
+                    continue
+                f.write(digest)
+                counts[(digest[0] << 8) | digest[1]] += 1
+                previous = digest
+                count += 1
+            fanout = [0]
+            for bucket in counts:
+                fanout.append(fanout[-1] + bucket)
+            f.write(cls.FANOUT.pack(*fanout))
+            f.seek(0)
+            f.write(cls.HEADER.pack(cls.MAGIC, count))
+        os.replace(tmp_file, index_file)
+        return count
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (2, 3):
+        print("Usage: python breach_check.py <hibp-sha1-dump.txt> [index_file]")
+        sys.exit(1)
+    written = BreachedPasswordChecker.build_index(*sys.argv[1:])
+    print(f"Indexed {written} breached password hashes")
@@ -0,0 +1,235 @@
+import json
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Optional
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+
+
+class DriverPool:
+    """
+    Pool of warm headless Chrome sessions.
+
+    Starting Chrome dominates the cost of a single autofill, so once the
+    first session is asked for, up to size browsers are started in the
+    background and reused. Nothing is started, and the chromedriver binary
+    is not resolved, before that. The binary is resolved once per process.
+    A session is health checked when it is handed out and wiped (cookies,
+    the storage of every origin it visited, its tab, implicit wait) when it
+    comes back, so callers never see
+    each other's state; sessions that fail either step are quit and
+    replaced. close() quits every browser, including checked-out ones.
+    """
+
+    _driver_path: Optional[str] = None
+    _path_lock = threading.Lock()
+    _shared: Optional["DriverPool"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, size: int = 2, page_load_timeout: float = 10, warm: bool = True):
+        self.size = size
+        self.page_load_timeout = page_load_timeout
+        self._idle: "queue.LifoQueue" = queue.LifoQueue()
+        # At most size sessions are handed out at once
+        self._slots = threading.BoundedSemaphore(size)
+        self._live = 0
+        # Every started browser, idle or checked out, so close() can quit them
+        self._drivers = set()
+        self.lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+        self.closed = False
+        # Warmed on first use rather than here, so a pool nobody uses costs nothing
+        self._warm_on_use = warm
+
+    @classmethod
+    def shared(cls) -> "DriverPool":
+        """The process-wide pool used by WebIntegration and WebAutomation by default."""
+        with cls._shared_lock:
+            if cls._shared is None or cls._shared.closed:
+                cls._shared = cls()
+            return cls._shared
+
+    @classmethod
+    def driver_path(cls) -> str:
+        """Path of the chromedriver binary, downloaded or looked up only once."""
+        with cls._path_lock:
+            if cls._driver_path is None:
+                cls._driver_path = ChromeDriverManager().install()
+            return cls._driver_path
+
+    @staticmethod
+    def _options() -> webdriver.ChromeOptions:
+        options = webdriver.ChromeOptions()
+        options.add_argument('--headless=new')  # Modern headless mode
+        options.add_argument('--disable-gpu')
+        options.add_argument('--no-sandbox')
+        options.add_argument('--disable-dev-shm-usage')
+        options.add_argument('--disable-notifications')
+        options.add_experimental_option('excludeSwitches', ['enable-logging'])
+        # Page events only, to learn every origin a session navigated to
+        options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+        options.add_experimental_option('perfLoggingPrefs', {'enableNetwork': False, 'enablePage': True})
+        return options
+
+    def _create(self) -> webdriver.Chrome:
+        driver = webdriver.Chrome(service=Service(self.driver_path()), options=self._options())
+        driver.set_page_load_timeout(self.page_load_timeout)
+        with self.lock:
+            closed = self.closed
+            if not closed:
+                self._drivers.add(driver)
+                self.created += 1
+        if closed:
+            driver.quit()
+            raise RuntimeError("Browser pool is closed")
+        return driver
+
+    def _reserve(self) -> bool:
+        with self.lock:
+            if self.closed or self._live >= self.size:
+                return False
+            self._live += 1
+            return True
+
+    def _discard(self, driver):
+        with self.lock:
+            if driver not in self._drivers:
+                # Already quit, e.g. by close()
+                return
+            self._drivers.discard(driver)
+            self._live -= 1
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def warm(self):
+        """Start browsers until the pool holds size of them."""
+        while self._reserve():
+            try:
+                self._idle.put(self._create())
+            except Exception as e:
+                with self.lock:
+                    self._live -= 1
+                if not self.closed:
+                    print(f"Failed to warm browser: {str(e)}")
+                return
+
+    @staticmethod
+    def is_healthy(driver) -> bool:
+        try:
+            return driver.execute_script("return 1") == 1
+        except Exception:
+            # A quit driver fails with connection errors, not WebDriverException
+            return False
+
+    def acquire(self, timeout: Optional[float] = None):
+        """Take a session, waiting up to timeout for one to become free."""
+        if self.closed:
+            raise RuntimeError("Browser pool is closed")
+        with self.lock:
+            warm, self._warm_on_use = self._warm_on_use, False
+        if warm:
+            threading.Thread(target=self.warm, daemon=True).start()
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError("No browser session became available")
+        try:
+            while True:
+                try:
+                    driver = self._idle.get_nowait()
+                except queue.Empty:
+                    break
+                if self.is_healthy(driver):
+                    with self.lock:
+                        self.reused += 1
+                    return driver
+                self._discard(driver)
+            # Nothing idle; a slot is held, so starting one stays within size
+            with self.lock:
+                self._live += 1
+            try:
+                return self._create()
+            except Exception:
+                with self.lock:
+                    self._live -= 1
+                raise
+        except Exception:
+            self._slots.release()
+            raise
+
+    @staticmethod
+    def _visited_origins(driver) -> set:
+        """Origins of every document loaded since the last call, redirects and frames included."""
+        origins = set()
+        for entry in driver.get_log("performance"):
+            message = json.loads(entry["message"])["message"]
+            if message.get("method") == "Page.frameNavigated":
+                origins.add(message["params"]["frame"].get("securityOrigin"))
+        origins.add(driver.execute_script("return location.origin;"))
+        return {origin for origin in origins if origin and origin not in ("null", "://")}
+
+    def _wipe(self, driver):
+        """Clear what the last borrower left behind: storage, cookies and the tab."""
+        # Each origin on the way (e.g. site -> SSO host) may have stored data
+        for origin in self._visited_origins(driver):
+            driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"})
+        # delete_all_cookies would only clear the current site
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        # sessionStorage belongs to the tab, so the tab itself is replaced
+        old_tab = driver.current_window_handle
+        driver.switch_to.new_window("tab")
+        new_tab = driver.current_window_handle
+        driver.switch_to.window(old_tab)
+        driver.close()
+        driver.switch_to.window(new_tab)
+
+    def release(self, driver, healthy: bool = True):
+        """Return a session, wiping its state; broken sessions are quit."""
+        try:
+            if healthy:
+                try:
+                    driver.implicitly_wait(0)
+                    self._wipe(driver)
+                except Exception:
+                    healthy = False
+            with self.lock:
+                # A session started while the pool was still warming up
+                surplus = self._live > self.size or self.closed
+            if healthy and not surplus:
+                self._idle.put(driver)
+            else:
+                self._discard(driver)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def session(self, timeout: Optional[float] = None):
+        """Borrow a session for the duration of a with block."""
+        driver = self.acquire(timeout)
+        healthy = True
+        try:
+            yield driver
+        except WebDriverException:
+            # Missing elements are WebDriverExceptions too; keep the
+            # session unless the browser itself stopped responding
+            healthy = self.is_healthy(driver)
+            raise
+        finally:
+            self.release(driver, healthy)
+
+    def close(self):
+        """Quit every browser, idle or checked out; sessions in use fail from here on."""
+        with self.lock:
+            self.closed = True
+            drivers = list(self._drivers)
+        while True:
+            try:
+                self._idle.get_nowait()
+            except queue.Empty:
+                break
+        for driver in drivers:
+            self._discard(driver)
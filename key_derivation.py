@@ -0,0 +1,135 @@
+import base64
+import json
+import os
+import time
+from dataclasses import dataclass, asdict
+from typing import Optional
+from cryptography.fernet import Fernet, InvalidToken
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from cryptography.hazmat.primitives.kdf.scrypt import Scrypt
+
+
+@dataclass
+class KdfParams:
+    algorithm: str = "pbkdf2"
+    salt: str = ""
+    # PBKDF2-HMAC-SHA256
+    iterations: int = 600000
+    # scrypt
+    n: int = 2 ** 15
+    r: int = 8
+    p: int = 1
+
+    def derive(self, password: str) -> bytes:
+        """Derive a Fernet key from password with these parameters."""
+        salt = base64.b64decode(self.salt)
+        if self.algorithm == "scrypt":
+            kdf = Scrypt(salt=salt, length=32, n=self.n, r=self.r, p=self.p)
+        else:
+            kdf = PBKDF2HMAC(
+                algorithm=hashes.SHA256(),
+                length=32,
+                salt=salt,
+                iterations=self.iterations,
+            )
+        return base64.urlsafe_b64encode(kdf.derive(password.encode()))
+
+
+def calibrate(algorithm: str = "pbkdf2", target_seconds: float = 0.5) -> KdfParams:
+    """
+    Pick KDF cost parameters that take about target_seconds on this machine.
+    PBKDF2 never goes below 100,000 iterations; scrypt doubles n until the
+    target is reached (capped at 2**17, i.e. 128 MiB of memory).
+    """
+    params = KdfParams(algorithm=algorithm, salt=base64.b64encode(os.urandom(16)).decode())
+    if algorithm == "scrypt":
+        params.n = 2 ** 14
+        while params.n < 2 ** 17:
+            start = time.perf_counter()
+            params.derive("calibration")
+            if time.perf_counter() - start >= target_seconds:
+                break
+            params.n *= 2
+        return params
+
+    sample = 20000
+    params.iterations = sample
+    start = time.perf_counter()
+    params.derive("calibration")
+    elapsed = max(time.perf_counter() - start, 1e-6)
+    params.iterations = max(100000, int(sample * target_seconds / elapsed))
+    return params
+
+
+class MasterKey:
+    """
+    Vault data key wrapped with a key derived from the master password.
+
+    The key file holds the KDF parameters and the Fernet-wrapped data key
+    as JSON. Older vaults stored the raw data key in the same file; that
+    format is still read and is wrapped on the next unlock.
+    """
+
+    def __init__(self, key_file: str = "key.key", algorithm: str = "pbkdf2", target_seconds: float = 0.5):
+        self.key_file = key_file
+        self.algorithm = algorithm
+        self.target_seconds = target_seconds
+
+    def _read(self) -> Optional[bytes]:
+        if not os.path.exists(self.key_file):
+            return None
+        with open(self.key_file, "rb") as f:
+            return f.read().strip()
+
+    def unwrapped_key(self) -> Optional[bytes]:
+        """The data key if it is not protected by a master password yet."""
+        content = self._read()
+        if content is None or content.startswith(b"{"):
+            return None
+        return content
+
+    def is_wrapped(self) -> bool:
+        content = self._read()
+        return content is not None and content.startswith(b"{")
+
+    def ensure_key(self) -> Optional[bytes]:
+        """
+        Create a data key if none exists. Returns it while it is still
+        unwrapped (before the first unlock), otherwise None.
+        """
+        if self._read() is None:
+            self._write_raw(Fernet.generate_key())
+        return self.unwrapped_key()
+
+    def unlock(self, master_password: str) -> Optional[bytes]:
+        """
+        Return the vault data key, or None if the password is wrong.
+        A new or legacy key is wrapped with the master password first.
+        """
+        content = self._read()
+        if content is None or not content.startswith(b"{"):
+            data_key = content or Fernet.generate_key()
+            self.wrap(master_password, data_key)
+            return data_key
+
+        stored = json.loads(content)
+        params = KdfParams(**stored["kdf"])
+        try:
+            return Fernet(params.derive(master_password)).decrypt(stored["wrapped_key"].encode())
+        except InvalidToken:
+            return None
+
+    def wrap(self, master_password: str, data_key: bytes):
+        """Protect data_key with master_password, using freshly calibrated KDF costs."""
+        params = calibrate(self.algorithm, self.target_seconds)
+        wrapped = Fernet(params.derive(master_password)).encrypt(data_key)
+        content = json.dumps({"kdf": asdict(params), "wrapped_key": wrapped.decode()}, indent=4)
+        tmp_file = self.key_file + ".tmp"
+        with open(tmp_file, "w") as f:
+            f.write(content)
+        os.replace(tmp_file, self.key_file)
+
+    def _write_raw(self, data_key: bytes):
+        with open(self.key_file, "wb") as f:
+            f.write(data_key)
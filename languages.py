@@ -11,6 +11,7 @@ class Language:
             "title_login": "Password Manager - Login" if not is_finnish else "Salasanojen Hallinta - Kirjautuminen",
             "title_main": "Password Manager" if not is_finnish else "Salasanojen Hallinta",
             "title_reset": "Reset Master Password" if not is_finnish else "Palauta Pääsalasana",
+            "title_recovery": "Enable Password Recovery" if not is_finnish else "Ota salasanan palautus käyttöön",
             "title_setup": "First Time Setup" if not is_finnish else "Ensimmäinen Asennus",
             
             # Login window
@@ -22,6 +23,10 @@ class Language:
             # Security questions
             "setup_questions": "Set up security questions:" if not is_finnish else "Määritä turvallisuuskysymykset:",
             "answer_questions": "Answer security questions:" if not is_finnish else "Vastaa turvallisuuskysymyksiin:",
+            "recovery_needs_answers": "Answer your security questions once more so \"Forgot password\" can recover this vault." \
+                if not is_finnish else "Vastaa turvallisuuskysymyksiin vielä kerran, jotta holvi voidaan palauttaa unohtuneen salasanan avulla.",
+            "recovery_enabled": "Password recovery is enabled." if not is_finnish else "Salasanan palautus on käytössä.",
+            "skip": "Skip" if not is_finnish else "Ohita",
             "question1": "What was your first pet's name?" if not is_finnish else "Mikä oli ensimmäisen lemmikkisi nimi?",
             "question2": "In which city were you born?" if not is_finnish else "Missä kaupungissa synnyit?",
             "question3": "What was your childhood nickname?" if not is_finnish else "Mikä oli lapsuuden lempinimesi?",
@@ -82,6 +87,10 @@ class Language:
             "url_opened": "Opening URL for {}" if not is_finnish else "Avataan osoite palvelulle {}",
             "auto_fill_started": "Starting auto-fill for {}" if not is_finnish else "Aloitetaan automaattinen täyttö palvelulle {}",
             "search_results": "Found {} matches" if not is_finnish else "Löydettiin {} osumaa",
+            "page_status": "Page {} of {}" if not is_finnish else "Sivu {} / {}",
+            "cancel": "Cancel" if not is_finnish else "Peruuta",
+            "task_cancelled": "Cancelled" if not is_finnish else "Peruutettu",
+            "import_progress": "Imported {} passwords..." if not is_finnish else "Tuotu {} salasanaa...",
             "category_filter": "Showing {} passwords in category {}" if not is_finnish else "Näytetään {} salasanaa kategoriassa {}",
             "fill_required": "Please fill in all required fields!" if not is_finnish else "Täytä kaikki pakolliset kentät!",
             "select_service": "Please select a service first!" if not is_finnish else "Valitse ensin palvelu!",
@@ -93,6 +102,11 @@ class Language:
             "select_service_url": "Please select a service and enter a URL!" if not is_finnish else "Valitse palvelu ja anna verkko-osoite!",
             "login_successful": "Login successful!" if not is_finnish else "Kirjautuminen onnistui!",
             "logout_successful": "Logout successful!" if not is_finnish else "Uloskirjautuminen onnistui!",
+            "select_import_file": "Select a CSV/JSON export or a backup to import" if not is_finnish else "Valitse tuotava CSV/JSON-tiedosto tai varmuuskopio",
+            "select_backup_file": "Save encrypted backup as" if not is_finnish else "Tallenna salattu varmuuskopio nimellä",
+            "export_done": "Backed up {} passwords" if not is_finnish else "Varmuuskopioitiin {} salasanaa",
+            "restore_done": "Restored {} passwords from backup" if not is_finnish else "Palautettiin {} salasanaa varmuuskopiosta",
+            "import_done": "Imported {} passwords ({} skipped, {:.0f}/s)" if not is_finnish else "Tuotiin {} salasanaa ({} ohitettu, {:.0f}/s)",
             
             # Password strength levels
             "very_strong": "Very Strong" if not is_finnish else "Erittäin Vahva",
@@ -111,6 +125,9 @@ class Language:
             # Error messages
             "master_password_weak": "Master password too weak! Must contain uppercase, lowercase, numbers, and special characters." \
                 if not is_finnish else "Pääsalasana liian heikko! Täytyy sisältää isoja ja pieniä kirjaimia, numeroita ja erikoismerkkejä.",
+            "wrong_master_password": "Incorrect master password!" if not is_finnish else "Väärä pääsalasana!",
+            "recovery_unavailable": "This vault's key cannot be recovered with the security questions." \
+                if not is_finnish else "Holvin avainta ei voi palauttaa turvallisuuskysymyksillä.",
             "error_occurred": "An error occurred:" if not is_finnish else "Tapahtui virhe:"
         }
     
@@ -0,0 +1,226 @@
+import json
+import os
+import re
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+# Login locators for well-known sites, used until known_sites.json exists
+DEFAULT_SITES = {
+    "github.com": {
+        "login_url": "https://github.com/login",
+        "username_field": {"id": "login_field"},
+        "password_field": {"id": "password"},
+        "submit_button": {"name": "commit"}
+    },
+    "google.com": {
+        "login_url": "https://accounts.google.com/signin",
+        "username_field": {"name": "identifier"},
+        "password_field": {"name": "password"},
+        "submit_button": {"id": "passwordNext"}
+    },
+    "facebook.com": {
+        "login_url": "https://www.facebook.com/login",
+        "username_field": {"id": "email"},
+        "password_field": {"id": "pass"},
+        "submit_button": {"name": "login"}
+    },
+    "twitter.com": {
+        "login_url": "https://twitter.com/login",
+        "username_field": {"name": "text"},
+        "password_field": {"name": "password"},
+        "submit_button": {"xpath": "//div[@data-testid='LoginForm_Login_Button']"}
+    },
+    "linkedin.com": {
+        "login_url": "https://www.linkedin.com/login",
+        "username_field": {"id": "username"},
+        "password_field": {"id": "password"},
+        "submit_button": {"xpath": "//button[@type='submit']"}
+    },
+    "instagram.com": {
+        "login_url": "https://www.instagram.com/accounts/login",
+        "username_field": {"name": "username"},
+        "password_field": {"name": "password"},
+        "submit_button": {"xpath": "//button[@type='submit']"}
+    },
+    "amazon.com": {
+        "login_url": "https://www.amazon.com/ap/signin",
+        "username_field": {"id": "ap_email"},
+        "password_field": {"id": "ap_password"},
+        "submit_button": {"id": "signInSubmit"}
+    },
+    "microsoft.com": {
+        "login_url": "https://login.live.com",
+        "username_field": {"name": "loginfmt"},
+        "password_field": {"name": "passwd"},
+        "submit_button": {"id": "idSIButton9"}
+    },
+    "reddit.com": {
+        "login_url": "https://www.reddit.com/login",
+        "username_field": {"id": "loginUsername"},
+        "password_field": {"id": "loginPassword"},
+        "submit_button": {"xpath": "//button[@type='submit']"}
+    },
+    "netflix.com": {
+        "login_url": "https://www.netflix.com/login",
+        "username_field": {"id": "id_userLoginId"},
+        "password_field": {"id": "id_password"},
+        "submit_button": {"xpath": "//button[@type='submit']"}
+    },
+    "spotify.com": {
+        "login_url": "https://accounts.spotify.com/login",
+        "username_field": {"id": "login-username"},
+        "password_field": {"id": "login-password"},
+        "submit_button": {"id": "login-button"}
+    },
+    "dropbox.com": {
+        "login_url": "https://www.dropbox.com/login",
+        "username_field": {"name": "login_email"},
+        "password_field": {"name": "login_password"},
+        "submit_button": {"xpath": "//button[@type='submit']"}
+    },
+    "yahoo.com": {
+        "login_url": "https://login.yahoo.com",
+        "username_field": {"id": "login-username"},
+        "password_field": {"id": "login-passwd"},
+        "submit_button": {"id": "login-signin"}
+    },
+    "twitch.tv": {
+        "login_url": "https://www.twitch.tv/login",
+        "username_field": {"id": "login-username"},
+        "password_field": {"id": "password-input"},
+        "submit_button": {"xpath": "//button[@data-a-target='passport-login-button']"}
+    },
+    "discord.com": {
+        "login_url": "https://discord.com/login",
+        "username_field": {"name": "email"},
+        "password_field": {"name": "password"},
+        "submit_button": {"xpath": "//button[@type='submit']"}
+    }
+}
+
+
+@dataclass
+class LocatorCacheStats:
+    hits: int = 0
+    misses: int = 0
+    invalidations: int = 0
+    # Estimated detection time avoided by cache hits
+    saved_seconds: float = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class LocatorCache:
+    """
+    Login locators per domain, in the known_sites.json format.
+
+    Locators found by a successful detection are stored under the page's
+    domain so the next autofill on that site can skip detection. Callers
+    validate a cached entry before using it and invalidate it when it no
+    longer matches the page. Changes are written in the background, a
+    short while after the last one, through a temporary file and
+    os.replace so the file is never left half-written.
+    """
+
+    _shared: Optional["LocatorCache"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, cache_file: str = "known_sites.json", save_delay: float = 1.0):
+        self.cache_file = cache_file
+        self.save_delay = save_delay
+        self.lock = threading.RLock()
+        self.sites: Dict[str, Dict] = self._load()
+        self.stats = LocatorCacheStats()
+        # Running average of a full detection, to estimate what a hit saves
+        self._detect_seconds = 0.0
+        self._detections = 0
+        self._save_timer: Optional[threading.Timer] = None
+
+    @classmethod
+    def shared(cls) -> "LocatorCache":
+        """The process-wide cache used by WebIntegration and WebAutomation by default."""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def _load(self) -> Dict[str, Dict]:
+        if os.path.exists(self.cache_file):
+            with open(self.cache_file, "r") as f:
+                return json.load(f)
+        return json.loads(json.dumps(DEFAULT_SITES))
+
+    @staticmethod
+    def domain(url: str) -> str:
+        """Extract domain from URL."""
+        match = re.search(r'(?:https?://)?(?:www\.)?([^/]+)', url)
+        return match.group(1) if match else url
+
+    def get(self, domain: str) -> Optional[Dict]:
+        with self.lock:
+            site = self.sites.get(domain)
+            return dict(site) if site else None
+
+    def store(self, domain: str, locators: Dict[str, Dict], login_url: Optional[str] = None):
+        """Remember the locators that worked on domain."""
+        with self.lock:
+            site = dict(self.sites.get(domain, {}))
+            if login_url:
+                site.setdefault("login_url", login_url)
+            site.update(locators)
+            if self.sites.get(domain) == site:
+                return
+            self.sites[domain] = site
+        self._schedule_save()
+
+    def invalidate(self, domain: str):
+        """Forget the locators of domain after they failed to match."""
+        with self.lock:
+            if self.sites.pop(domain, None) is None:
+                return
+            self.stats.invalidations += 1
+        self._schedule_save()
+
+    def record_detection(self, seconds: float):
+        """Account for a full detection that ran because of a miss."""
+        with self.lock:
+            self.stats.misses += 1
+            self._detections += 1
+            self._detect_seconds += (seconds - self._detect_seconds) / self._detections
+
+    def record_hit(self, seconds: float):
+        """Account for a hit whose validation took seconds."""
+        with self.lock:
+            self.stats.hits += 1
+            self.stats.saved_seconds += max(0.0, self._detect_seconds - seconds)
+
+    def _schedule_save(self):
+        with self.lock:
+            if self._save_timer is not None:
+                return
+            self._save_timer = threading.Timer(self.save_delay, self.save)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def save(self):
+        """Write the cache file now."""
+        with self.lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+            content = json.dumps(self.sites, indent=4)
+            tmp_file = self.cache_file + ".tmp"
+            with open(tmp_file, "w") as f:
+                f.write(content)
+            os.replace(tmp_file, self.cache_file)
+
+    def flush(self):
+        """Write pending changes, if any, before exiting."""
+        with self.lock:
+            pending = self._save_timer is not None
+        if pending:
+            self.save()
@@ -0,0 +1,145 @@
+from typing import Dict, Optional, Tuple
+
+# Scores every input and button on the page in one pass and returns the
+# best username field, password field and submit button, each with a
+# locator that can be stored and the element itself.
+DETECT_LOGIN_FIELDS_JS = r"""
+const isVisible = el => {
+    const rect = el.getBoundingClientRect();
+    const style = window.getComputedStyle(el);
+    return rect.width > 0 && rect.height > 0 && style.visibility !== 'hidden' && style.display !== 'none';
+};
+const describe = el => [
+    el.id, el.name, el.className, el.getAttribute('autocomplete'),
+    el.getAttribute('placeholder'), el.getAttribute('aria-label')
+].join(' ').toLowerCase();
+const locate = el => {
+    if (el.id && document.querySelectorAll('#' + CSS.escape(el.id)).length === 1) {
+        return {id: el.id};
+    }
+    if (el.name && document.getElementsByName(el.name).length === 1) {
+        return {name: el.name};
+    }
+    const path = [];
+    for (let node = el; node && node !== document.documentElement; node = node.parentElement) {
+        let index = 1;
+        for (let sibling = node.previousElementSibling; sibling; sibling = sibling.previousElementSibling) {
+            if (sibling.tagName === node.tagName) index++;
+        }
+        path.unshift(node.tagName.toLowerCase() + ':nth-of-type(' + index + ')');
+    }
+    return {css: 'html > ' + path.join(' > ')};
+};
+const best = (candidates, score) => {
+    let found = null, top = -Infinity;
+    for (const el of candidates) {
+        const value = score(el);
+        if (value > top) { top = value; found = el; }
+    }
+    return found && {locator: locate(found), element: found, visible: isVisible(found)};
+};
+
+const inputs = Array.from(document.querySelectorAll('input'));
+const password = best(inputs.filter(el => el.type === 'password'), el => {
+    const text = describe(el);
+    let score = isVisible(el) ? 10 : 0;
+    if (text.includes('current-password')) score += 5;
+    if (/new-password|confirm/.test(text)) score -= 5;
+    if (/pass|pwd/.test(text)) score += 2;
+    return score;
+});
+const form = password ? password.element.form : null;
+const username = best(inputs.filter(el => ['text', 'email', 'tel'].includes(el.type)), el => {
+    const text = describe(el);
+    let score = isVisible(el) ? 10 : 0;
+    if (el.type === 'email') score += 4;
+    if (/username|email/.test(el.getAttribute('autocomplete') || '')) score += 6;
+    if (/user|email|login|account|phone|identifier/.test(text)) score += 3;
+    if (form && el.form === form) score += 5;
+    if (password && (el.compareDocumentPosition(password.element) & Node.DOCUMENT_POSITION_FOLLOWING)) score += 2;
+    if (/search/.test(text)) score -= 8;
+    return score;
+});
+const buttons = Array.from(document.querySelectorAll(
+    'button, input[type="submit"], input[type="button"], [role="button"]'));
+const submit = best(buttons, el => {
+    const text = (describe(el) + ' ' + (el.innerText || el.value || '')).toLowerCase();
+    let score = isVisible(el) ? 10 : 0;
+    if (el.type === 'submit') score += 4;
+    if (form && el.form === form) score += 5;
+    if (/log ?in|sign ?in|continue|next|submit/.test(text)) score += 3;
+    if (/sign ?up|register|forgot|search/.test(text)) score -= 6;
+    return score;
+});
+return [username, password, submit];
+"""
+
+# Resolves stored locators (arguments[0], a list of locator dicts or nulls)
+# in one round-trip; the result has the same shape as detection's, plus
+# the tag, type and role of each element so callers can check its kind
+RESOLVE_LOCATORS_JS = r"""
+const isVisible = el => {
+    const rect = el.getBoundingClientRect();
+    const style = window.getComputedStyle(el);
+    return rect.width > 0 && rect.height > 0 && style.visibility !== 'hidden' && style.display !== 'none';
+};
+const resolve = locator => {
+    if (!locator) return null;
+    if (locator.id !== undefined) return document.getElementById(locator.id);
+    if (locator.name !== undefined) return document.getElementsByName(locator.name)[0] || null;
+    if (locator.css !== undefined) return document.querySelector(locator.css);
+    if (locator.xpath !== undefined) {
+        return document.evaluate(locator.xpath, document, null,
+            XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    }
+    return null;
+};
+return arguments[0].map(locator => {
+    const el = resolve(locator);
+    return el && {
+        locator: locator, element: el, visible: isVisible(el),
+        tag: el.tagName.toLowerCase(), type: (el.getAttribute('type') || '').toLowerCase(),
+        role: (el.getAttribute('role') || '').toLowerCase()
+    };
+});
+"""
+
+# Roles of the detected elements, as keys of a known_sites entry
+ROLES = ("username_field", "password_field", "submit_button")
+
+Candidate = Optional[Dict]
+
+
+def detect_login_fields(driver) -> Tuple[Candidate, Candidate, Candidate]:
+    """
+    Find the username field, password field and submit button with a
+    single WebDriver round-trip. Each is None or a dict with the stored
+    form of its locator ("locator"), the WebElement ("element") and
+    whether it is displayed ("visible").
+    """
+    result = driver.execute_script(DETECT_LOGIN_FIELDS_JS)
+    if not result:
+        return None, None, None
+    return tuple(result)
+
+
+def resolve_locators(driver, site: Dict[str, Dict]) -> Tuple[Candidate, Candidate, Candidate]:
+    """
+    Look up the stored locators of a known_sites entry with a single
+    round-trip; the result has the same shape as detect_login_fields,
+    with the element's "tag", "type" and "role" added.
+    """
+    result = driver.execute_script(RESOLVE_LOCATORS_JS, [site.get(role) for role in ROLES])
+    return tuple(result)
+
+
+def matches_role(candidate: Dict, role: str) -> bool:
+    """Whether a resolved element is still the kind of element role needs."""
+    tag, kind = candidate.get("tag"), candidate.get("type")
+    if role == "password_field":
+        return tag == "input" and kind == "password"
+    if role == "username_field":
+        # An input without a type attribute is a text input
+        return tag == "input" and kind in ("", "text", "email", "tel")
+    return (tag == "button" or (tag == "input" and kind in ("submit", "button"))
+            or candidate.get("role") == "button")
@@ -0,0 +1,336 @@
+import http.client
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+# Outcomes of a probe
+LOGIN_FORM = "login_form"
+NO_FORM = "no_form"
+NEEDS_BROWSER = "needs_browser"
+
+# Attributes that identify a field when its id and name don't
+_LOCATOR_ATTRIBUTES = ("autocomplete", "aria-label", "placeholder", "data-testid", "title")
+
+# Mount points of client-rendered apps
+_APP_ROOTS = {"root", "app", "__next", "__nuxt", "main-app"}
+
+
+@dataclass
+class ProbeResult:
+    url: str
+    status: str
+    message: str = ""
+    # Locators by role, in the known_sites format
+    locators: Dict[str, Dict] = field(default_factory=dict)
+    elapsed: float = 0.0
+
+    @property
+    def found(self) -> bool:
+        return self.status == LOGIN_FORM
+
+    @property
+    def needs_browser(self) -> bool:
+        return self.status == NEEDS_BROWSER
+
+
+class _LoginFormParser(HTMLParser):
+    """Collects inputs, buttons and the hints needed to tell a JS-rendered page."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.inputs: List[Dict] = []
+        self.buttons: List[Dict] = []
+        self.ids: Dict[str, int] = {}
+        self.names: Dict[str, int] = {}
+        self.scripts = 0
+        self.app_root = False
+        self.text_length = 0
+        self._form = None
+        self._forms = 0
+        self._button = None
+        self._skip = 0
+
+    def handle_starttag(self, tag, attrs):
+        if self._skip and tag != "template":
+            # Content of a <template> is not part of the rendered page
+            return
+        attrs = {name: value or "" for name, value in attrs}
+        if attrs.get("id"):
+            self.ids[attrs["id"]] = self.ids.get(attrs["id"], 0) + 1
+        if attrs.get("name"):
+            self.names[attrs["name"]] = self.names.get(attrs["name"], 0) + 1
+        if tag in ("script", "style", "template"):
+            self._skip += 1
+            if tag == "script":
+                self.scripts += 1
+        elif tag == "form":
+            self._forms += 1
+            self._form = self._forms
+        elif tag == "input":
+            self.inputs.append({"attrs": attrs, "form": self._form, "index": len(self.inputs),
+                                "tag": "input", "type": attrs.get("type", "text").lower(), "text": ""})
+        elif tag == "button":
+            self._button = {"attrs": attrs, "form": self._form, "index": len(self.buttons),
+                            "tag": "button", "type": attrs.get("type", "submit").lower(), "text": ""}
+            self.buttons.append(self._button)
+        if tag == "div" and attrs.get("id") in _APP_ROOTS:
+            self.app_root = True
+
+    def handle_endtag(self, tag):
+        if self._skip and tag not in ("script", "style", "template"):
+            return
+        if tag in ("script", "style", "template"):
+            self._skip = max(0, self._skip - 1)
+        elif tag == "form":
+            self._form = None
+        elif tag == "button":
+            self._button = None
+
+    def handle_data(self, data):
+        if self._skip:
+            return
+        text = data.strip()
+        self.text_length += len(text)
+        if self._button is not None:
+            self._button["text"] += " " + text
+
+
+def _describe(element: Dict) -> str:
+    attrs = element["attrs"]
+    return " ".join(attrs.get(name, "") for name in
+                    ("id", "name", "class", "autocomplete", "placeholder", "aria-label")).lower()
+
+
+def _hidden(element: Dict) -> bool:
+    attrs = element["attrs"]
+    style = attrs.get("style", "").replace(" ", "").lower()
+    return "hidden" in attrs or "display:none" in style or "visibility:hidden" in style
+
+
+class LoginFormProbe:
+    """
+    Finds login forms by fetching a page over HTTP and parsing its HTML,
+    without starting a browser.
+
+    Connections are kept alive and reused per host. A page with a password
+    input is resolved here, with locators for the username field, password
+    field and submit button. A page without one is only reported as having
+    no login form when it does not look client-rendered; otherwise, and
+    when the fetch fails, the result asks for a browser.
+    """
+
+    _shared: Optional["LoginFormProbe"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, timeout: float = 5, max_bytes: int = 2 * 1024 * 1024, max_redirects: int = 5,
+                 connections_per_host: int = 4):
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.max_redirects = max_redirects
+        self.connections_per_host = connections_per_host
+        self.lock = threading.Lock()
+        # (scheme, host, port) -> idle keep-alive connections
+        self._idle: Dict[Tuple[str, str, int], List[http.client.HTTPConnection]] = {}
+
+    @classmethod
+    def shared(cls) -> "LoginFormProbe":
+        """The process-wide probe used by WebIntegration and WebAutomation by default."""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def _connection(self, key: Tuple[str, str, int]) -> Tuple[http.client.HTTPConnection, bool]:
+        """An idle connection for key if there is one, else a new one; and whether it was reused."""
+        with self.lock:
+            idle = self._idle.get(key)
+            if idle:
+                return idle.pop(), True
+        scheme, host, port = key
+        if scheme == "https":
+            return http.client.HTTPSConnection(host, port, timeout=self.timeout), False
+        return http.client.HTTPConnection(host, port, timeout=self.timeout), False
+
+    def _release(self, key: Tuple[str, str, int], connection: http.client.HTTPConnection):
+        with self.lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.connections_per_host:
+                idle.append(connection)
+                return
+        connection.close()
+
+    def _request(self, url: str) -> Tuple[int, Dict[str, str], bytes]:
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        if scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported URL scheme: {url}")
+        key = (scheme, parts.hostname or "", parts.port or (443 if scheme == "https" else 80))
+        path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        headers = {
+            "User-Agent": "Mozilla/5.0 (compatible; PasswordManager login probe)",
+            "Accept": "text/html,application/xhtml+xml",
+            "Accept-Encoding": "identity",
+        }
+        while True:
+            connection, reused = self._connection(key)
+            try:
+                connection.request("GET", path, headers=headers)
+                response = connection.getresponse()
+                body = response.read(self.max_bytes + 1)
+            except (http.client.HTTPException, OSError):
+                connection.close()
+                if reused:
+                    # The server closed an idle keep-alive connection; retry on a new one
+                    continue
+                raise
+            if response.will_close or len(body) > self.max_bytes or not response.isclosed():
+                connection.close()
+            else:
+                self._release(key, connection)
+            return response.status, {name.lower(): value for name, value in response.getheaders()}, body
+
+    def _fetch(self, url: str) -> Tuple[str, int, Dict[str, str], bytes]:
+        for _ in range(self.max_redirects + 1):
+            status, headers, body = self._request(url)
+            if status in (301, 302, 303, 307, 308) and headers.get("location"):
+                url = urljoin(url, headers["location"])
+                continue
+            return url, status, headers, body
+        raise http.client.HTTPException("Too many redirects")
+
+    def probe(self, url: str) -> ProbeResult:
+        """Look for a login form on url without a browser."""
+        start = time.perf_counter()
+        result = self._probe(url)
+        result.elapsed = time.perf_counter() - start
+        return result
+
+    def _probe(self, url: str) -> ProbeResult:
+        try:
+            final_url, status, headers, body = self._fetch(url)
+        except (http.client.HTTPException, OSError, ValueError) as e:
+            return ProbeResult(url, NEEDS_BROWSER, f"Fetch failed: {str(e)}")
+        if status in (404, 410):
+            return ProbeResult(final_url, NO_FORM, f"HTTP {status}")
+        if status >= 400:
+            # Bot challenges and the like may still work in a real browser
+            return ProbeResult(final_url, NEEDS_BROWSER, f"HTTP {status}")
+        content_type = headers.get("content-type", "")
+        if "html" not in content_type:
+            return ProbeResult(final_url, NEEDS_BROWSER, f"Not an HTML page: {content_type}")
+
+        charset = re.search(r"charset=([\w-]+)", content_type)
+        try:
+            html = body[:self.max_bytes].decode(charset.group(1) if charset else "utf-8", errors="replace")
+        except LookupError:
+            html = body[:self.max_bytes].decode("utf-8", errors="replace")
+        parser = _LoginFormParser()
+        parser.feed(html)
+        parser.close()
+
+        if any(element["type"] == "password" for element in parser.inputs):
+            # Locators are only given for elements that can be found reliably
+            return ProbeResult(final_url, LOGIN_FORM, "Login form found", self._locate(parser))
+        # Only an app mount point or a near-empty body means the form may be
+        # rendered later; analytics tags on a content page don't
+        if parser.scripts and (parser.app_root or parser.text_length < 200):
+            return ProbeResult(final_url, NEEDS_BROWSER, "Page is rendered by JavaScript")
+        return ProbeResult(final_url, NO_FORM, "No login form found")
+
+    @staticmethod
+    def _locator(element: Dict, parser: _LoginFormParser) -> Optional[Dict[str, str]]:
+        """
+        A locator that holds in the rendered page: a unique id or name, or
+        a unique identifying attribute. Positions in the static HTML are
+        not used, since scripts can add elements before this one; without
+        a reliable locator the result is None and nothing is stored.
+        """
+        attrs = element["attrs"]
+        if attrs.get("id") and parser.ids.get(attrs["id"]) == 1:
+            return {"id": attrs["id"]}
+        if attrs.get("name") and parser.names.get(attrs["name"]) == 1:
+            return {"name": attrs["name"]}
+        tag = element["tag"]
+        same_tag = [other["attrs"] for other in parser.inputs + parser.buttons if other["tag"] == tag]
+        for attr in _LOCATOR_ATTRIBUTES:
+            value = attrs.get(attr)
+            if value and sum(other.get(attr) == value for other in same_tag) == 1:
+                escaped = value.replace("\\", "\\\\").replace('"', '\\"')
+                return {"css": f'{tag}[{attr}="{escaped}"]'}
+        return None
+
+    def _locate(self, parser: _LoginFormParser) -> Dict[str, Dict]:
+        """Pick the login elements with the same signals as the in-browser detection."""
+        def best(candidates, score):
+            return max(candidates, key=score, default=None)
+
+        def password_score(element):
+            text = _describe(element)
+            score = 0 if _hidden(element) else 10
+            if "current-password" in text:
+                score += 5
+            if re.search(r"new-password|confirm", text):
+                score -= 5
+            if re.search(r"pass|pwd", text):
+                score += 2
+            return score
+
+        password = best([e for e in parser.inputs if e["type"] == "password"], password_score)
+        if password is None:
+            return {}
+        form = password["form"]
+
+        def username_score(element):
+            text = _describe(element)
+            score = 0 if _hidden(element) else 10
+            if element["type"] == "email":
+                score += 4
+            if re.search(r"username|email", element["attrs"].get("autocomplete", "")):
+                score += 6
+            if re.search(r"user|email|login|account|phone|identifier", text):
+                score += 3
+            if form is not None and element["form"] == form:
+                score += 5
+            if element["index"] < password["index"]:
+                score += 2
+            if "search" in text:
+                score -= 8
+            return score
+
+        def submit_score(element):
+            text = (_describe(element) + " " + element["text"] + " " +
+                    element["attrs"].get("value", "")).lower()
+            score = 0 if _hidden(element) else 10
+            if element["type"] == "submit":
+                score += 4
+            if form is not None and element["form"] == form:
+                score += 5
+            if re.search(r"log ?in|sign ?in|continue|next|submit", text):
+                score += 3
+            if re.search(r"sign ?up|register|forgot|search", text):
+                score -= 6
+            return score
+
+        username = best([e for e in parser.inputs if e["type"] in ("text", "email", "tel")], username_score)
+        submit_inputs = [e for e in parser.inputs if e["type"] in ("submit", "button")]
+        submit = best(parser.buttons + submit_inputs, submit_score)
+
+        locators = {}
+        for role, element in (("username_field", username), ("password_field", password),
+                              ("submit_button", submit)):
+            locator = self._locator(element, parser) if element is not None else None
+            if locator is not None:
+                locators[role] = locator
+        return locators
+
+    def close(self):
+        """Close every idle connection."""
+        with self.lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for connection in connections:
+                connection.close()
@@ -0,0 +1,110 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+from password_manager_core import PasswordEntry
+from web_integration import WebAutomation
+
+
+@dataclass
+class VerificationResult:
+    service: str
+    url: str
+    found: bool = False
+    message: str = ""
+    elapsed: float = 0.0
+    timed_out: bool = False
+
+
+@dataclass
+class VerificationReport:
+    total: int = 0
+    found: int = 0
+    missing: int = 0
+    timed_out: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def rate(self) -> float:
+        """Sites checked per second."""
+        return self.total / self.elapsed if self.elapsed else 0.0
+
+
+class BulkLoginVerifier:
+    """
+    Checks that the URLs of many vault entries still show a login form.
+
+    Sites are checked concurrently with WebAutomation.test_login_form,
+    each on its own session from the browser pool, so at most workers
+    browsers are busy at once. Results are yielded as they finish. A site
+    that takes longer than site_timeout is reported as timed out and the
+    run moves on without waiting for it.
+    """
+
+    def __init__(self, web_auto: Optional[WebAutomation] = None, workers: Optional[int] = None,
+                 site_timeout: float = 30):
+        self.web_auto = web_auto or WebAutomation()
+        self.workers = workers or self.web_auto.pool.size
+        self.site_timeout = site_timeout
+
+    def _check(self, index: int, service: str, url: str, started: Dict[int, float]) -> VerificationResult:
+        started[index] = time.perf_counter()
+        result = self.web_auto.test_login_form(url)
+        return VerificationResult(service, url, result.success, result.message,
+                                  result.timings.get("total", 0.0))
+
+    def verify(self, entries: Iterable[Tuple[str, PasswordEntry]]) -> Iterator[VerificationResult]:
+        """Yield a VerificationResult per entry with a URL, in completion order."""
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        # When each check actually started, for the per-site timeout
+        started: Dict[int, float] = {}
+        pending: Dict[Future, Tuple[int, str, str]] = {}
+        try:
+            for index, (service, entry) in enumerate(entries):
+                if not entry.url:
+                    continue
+                future = executor.submit(self._check, index, service, entry.url, started)
+                pending[future] = (index, service, entry.url)
+
+            while pending:
+                now = time.perf_counter()
+                deadlines = [started[index] + self.site_timeout
+                             for index, _, _ in pending.values() if index in started]
+                # Checks that start during the wait have deadlines after it
+                # ends, so waiting at most site_timeout never overshoots one
+                timeout = max(0.0, min(deadlines, default=now + self.site_timeout) - now)
+                done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    _, service, url = pending.pop(future)
+                    try:
+                        yield future.result()
+                    except Exception as e:
+                        yield VerificationResult(service, url, message=f"Error testing login form: {str(e)}")
+                now = time.perf_counter()
+                expired = [future for future, (index, _, _) in pending.items()
+                           if index in started and now - started[index] >= self.site_timeout]
+                for future in expired:
+                    index, service, url = pending.pop(future)
+                    yield VerificationResult(service, url, message="Timed out",
+                                             elapsed=now - started[index], timed_out=True)
+        finally:
+            # Checks still running finish in the background; queued ones are dropped
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def verify_all(self, entries: Iterable[Tuple[str, PasswordEntry]],
+                   callback: Optional[Callable[[VerificationResult], None]] = None) -> VerificationReport:
+        """Check every entry, passing each result to callback, and summarize the run."""
+        report = VerificationReport()
+        start = time.perf_counter()
+        for result in self.verify(entries):
+            report.total += 1
+            if result.timed_out:
+                report.timed_out += 1
+            elif result.found:
+                report.found += 1
+            else:
+                report.missing += 1
+            if callback:
+                callback(result)
+        report.elapsed = time.perf_counter() - start
+        return report
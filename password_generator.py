@@ -0,0 +1,87 @@
+import secrets
+import string
+import threading
+from dataclasses import dataclass, replace
+from typing import List, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class PasswordPolicy:
+    """Character classes a generated password must draw from and include."""
+    length: int = 16
+    classes: Tuple[str, ...] = (
+        string.ascii_lowercase,
+        string.ascii_uppercase,
+        string.digits,
+        "!@#$%^&*",
+    )
+
+    @property
+    def alphabet(self) -> str:
+        return "".join(self.classes)
+
+
+class PasswordGenerator:
+    """
+    Password generator that needs no retry loop.
+
+    One character is drawn from every class of the policy and the rest
+    from the full alphabet, then the result is shuffled, so every required
+    class is present by construction. Random bytes are pulled from
+    secrets.token_bytes in bulk and mapped to indices by rejecting the
+    bytes that would bias the modulo.
+
+    With the default policy any length of 7 or more scores at least 80 in
+    PasswordStrengthChecker.
+    """
+
+    def __init__(self, buffer_size: int = 4096):
+        self.buffer_size = buffer_size
+        self._buffer = b""
+        self._position = 0
+        self.lock = threading.Lock()
+
+    def _byte(self) -> int:
+        if self._position >= len(self._buffer):
+            self._buffer = secrets.token_bytes(self.buffer_size)
+            self._position = 0
+        value = self._buffer[self._position]
+        self._position += 1
+        return value
+
+    def _below(self, upper: int) -> int:
+        """Uniform random integer in [0, upper)."""
+        if upper > 256:
+            return secrets.randbelow(upper)
+        limit = 256 - 256 % upper
+        while True:
+            value = self._byte()
+            if value < limit:
+                return value % upper
+
+    def generate(self, policy: Optional[PasswordPolicy] = None) -> str:
+        policy = policy or PasswordPolicy()
+        if policy.length < len(policy.classes):
+            raise ValueError(
+                f"Length {policy.length} is too short for {len(policy.classes)} required character classes"
+            )
+        alphabet = policy.alphabet
+        with self.lock:
+            chars = [char_class[self._below(len(char_class))] for char_class in policy.classes]
+            chars += [alphabet[self._below(len(alphabet))] for _ in range(policy.length - len(chars))]
+            # Fisher-Yates shuffle so the required characters land anywhere
+            for i in range(len(chars) - 1, 0, -1):
+                j = self._below(i + 1)
+                chars[i], chars[j] = chars[j], chars[i]
+        return "".join(chars)
+
+    def generate_many(self, n: int, length: Optional[int] = None,
+                      policy: Optional[PasswordPolicy] = None) -> List[str]:
+        """
+        Generate n passwords, e.g. to provision many credentials at once.
+        length overrides the policy's length when given.
+        """
+        policy = policy or PasswordPolicy()
+        if length is not None:
+            policy = replace(policy, length=length)
+        return [self.generate(policy) for _ in range(n)]
@@ -3,6 +3,10 @@ from password_manager_core import PasswordManager
 from web_integration import WebAutomation
 from languages import Language
 from security_questions import SecurityQuestions
+from vault_import import VaultImporter
+from vault_backup import VaultBackup
+from result_pager import ResultPager
+from task_runner import TaskRunner
 
 def create_security_setup_window(lang: Language):
     """Create window for setting up security questions"""
@@ -59,6 +63,29 @@ def create_reset_window(lang: Language):
         finalize=True
     )
 
+def create_recovery_window(lang: Language):
+    """Create window asking for the security answers to enable password recovery"""
+    layout = [
+        [sg.Text(lang.get("recovery_needs_answers"), font=('Helvetica', 10), size=(50, 2))],
+        [sg.Text(lang.get("question1"), font=('Helvetica', 10))],
+        [sg.Input(key='-ANSWER1-', font=('Helvetica', 10), size=(40, 1))],
+        [sg.Text(lang.get("question2"), font=('Helvetica', 10))],
+        [sg.Input(key='-ANSWER2-', font=('Helvetica', 10), size=(40, 1))],
+        [sg.Text(lang.get("question3"), font=('Helvetica', 10))],
+        [sg.Input(key='-ANSWER3-', font=('Helvetica', 10), size=(40, 1))],
+        [sg.Button(lang.get("save_answers"), font=('Helvetica', 10)),
+         sg.Button(lang.get("skip"), font=('Helvetica', 10))]
+    ]
+    
+    return sg.Window(
+        lang.get("title_recovery"),
+        layout,
+        font=('Helvetica', 10),
+        margins=(30, 20),
+        element_padding=(10, 5),
+        finalize=True
+    )
+
 def create_window(lang: Language):
     # Modern dark theme with blue accents
     sg.theme('DarkBlue')
@@ -120,7 +147,10 @@ def create_main_window(lang: Language):
                  key='-CATEGORY-', enable_events=True, font=normal_font,
                  size=(20, 1))],
         [sg.Listbox(values=[], size=(45, 8), key='-LIST-', 
-                   enable_events=True, font=normal_font)]
+                   enable_events=True, font=normal_font)],
+        [sg.Button('◀', key='-PREV-PAGE-', font=normal_font),
+         sg.Text('', key='-PAGE-', size=(20, 1), font=normal_font, justification='center'),
+         sg.Button('▶', key='-NEXT-PAGE-', font=normal_font)]
     ]
     
     password_frame = [
@@ -129,8 +159,8 @@ def create_main_window(lang: Language):
         [sg.Text(lang.get("username"), font=normal_font), 
          sg.Input(key='-USERNAME-', font=normal_font, size=(30, 1))],
         [sg.Text(lang.get("password"), font=normal_font), 
-         sg.Input(key='-PASSWORD-', password_char='•', font=normal_font,
-                 size=(30, 1)),
+         sg.Input(key='-PASSWORD-', password_char='•', enable_events=True,
+                 font=normal_font, size=(30, 1)),
          sg.Button('👁', key='-TOGGLE-PASS-', font=normal_font),
          sg.Button(lang.get("generate"), font=normal_font)],
         [sg.Text(lang.get("strength"), font=normal_font), 
@@ -172,7 +202,10 @@ def create_main_window(lang: Language):
          sg.Button(lang.get("logout"), font=normal_font, button_color=('#FFFFFF', '#D83B01'))],
         [sg.Text(lang.get("status"), font=normal_font), 
          sg.Text('', key='-STATUS-', size=(50, 1), font=normal_font,
-                text_color='#0078D4')]
+                text_color='#0078D4')],
+        [sg.ProgressBar(100, orientation='h', size=(30, 10), key='-TASK-BAR-',
+                       bar_color=('#0078D4', '#3D3D3D')),
+         sg.Button(lang.get("cancel"), key='-CANCEL-TASK-', font=normal_font, disabled=True)]
     ]
     
     return sg.Window(
@@ -184,30 +217,72 @@ def create_main_window(lang: Language):
         finalize=True
     )
 
-def run_main_window(window, lang, master_password):
-    password_manager = PasswordManager()
+# Quiet period after the last keystroke before the strength meter refreshes
+STRENGTH_DEBOUNCE_MS = 150
+
+def run_main_window(window, lang, password_manager):
     web_auto = WebAutomation()
     show_password = False
     current_service = None
+    strength_pending = False
+    shown_strength = None
+    # Saves, imports and browser automation run here, off the event loop
+    runner = TaskRunner(window)
+    # Only one page of the (possibly huge) result list is put in the Listbox
+    pager = ResultPager(password_manager, vault_lock=runner.vault_lock)
     
     def update_status(message, is_error=False):
         """Update status message with color"""
         color = '#FF0000' if is_error else '#0078D4'
         window['-STATUS-'].update(message, text_color=color)
     
-    def update_list(filter_text="", category=None):
-        """Update password list with optional filtering"""
-        if filter_text:
-            filtered = password_manager.search_passwords(filter_text)
-            update_status(lang.get("search_results").format(len(filtered)))
-        else:
-            filtered = password_manager.password_dict
-        
-        if category and category != lang.get("all"):
-            filtered = {k: v for k, v in filtered.items() if v.category == category}
-            update_status(lang.get("category_filter").format(len(filtered), category))
-        
-        window['-LIST-'].update(values=list(filtered.keys()))
+    def update_list(filter_text="", category=None, vault_changed=False):
+        """Start a search for the password list; results arrive as -RESULTS-"""
+        if not category or category == lang.get("all"):
+            category = None
+        if vault_changed:
+            pager.invalidate()
+        pager.search(filter_text, category, callback=lambda future: (
+            None if future.cancelled() or future.result() is None
+            else window.write_event_value('-RESULTS-', future.result())))
+    
+    def start_task(name, func, *args, **kwargs):
+        """Run func in the background; the outcome arrives as TaskRunner.DONE_EVENT"""
+        window['-TASK-BAR-'].update(0)
+        window['-CANCEL-TASK-'].update(disabled=False)
+        return runner.submit(name, func, *args, **kwargs)
+    
+    def add_entry(service, *fields):
+        return service, password_manager.add_password(service, *fields)
+    
+    def update_entry(old_service, service, *fields):
+        with password_manager.batch():
+            updated = (password_manager.delete_password(old_service) and
+                       password_manager.add_password(service, *fields))
+        return service, updated
+    
+    def delete_entry(service):
+        return service, password_manager.delete_password(service)
+    
+    def import_entries(import_file, task):
+        if import_file.endswith('.pmbak'):
+            return lang.get("restore_done").format(VaultBackup(password_manager).restore(import_file))
+        importer = VaultImporter(password_manager, progress=lambda status: task.report(
+            lang.get("import_progress").format(status.imported)))
+        result = importer.import_file(import_file)
+        return lang.get("import_done").format(result.imported, result.skipped, result.rate)
+    
+    def clear_form():
+        window['-SERVICE-'].update('')
+        window['-USERNAME-'].update('')
+        window['-PASSWORD-'].update('')
+        window['-URL-'].update('')
+        show_strength('')
+    
+    def show_page():
+        """Put the current page of results into the list"""
+        window['-LIST-'].update(values=pager.page_items())
+        window['-PAGE-'].update(lang.get("page_status").format(pager.page + 1, pager.page_count))
     
     def get_strength_text(score: int, lang: Language = None) -> str:
         """Get password strength text based on score"""
@@ -235,19 +310,72 @@ def run_main_window(window, lang, master_password):
             return lang.get("weak")
         else:
             return lang.get("very_weak")
+    
+    def strength_of(password: str):
+        """Strength meter contents for a password"""
+        if not password:
+            return 0, '', ''
+        score, _, _, feedback = password_manager.strength_checker.check_strength(password)
+        return score, get_strength_text(score, lang), feedback
+    
+    def show_strength(password: str):
+        """Update the strength widgets, skipping them if nothing changed"""
+        nonlocal shown_strength
+        strength = strength_of(password)
+        if strength == shown_strength:
+            return
+        score, text, feedback = strength
+        window['-STRENGTH-BAR-'].update(score)
+        window['-STRENGTH-'].update(text)
+        window['-FEEDBACK-'].update(feedback)
+        shown_strength = strength
+    
+    def close_session():
+        """Let pending vault writes land, then release the browsers and vault files"""
+        runner.shutdown()
+        # Quits idle browsers and those a still-running task has borrowed
+        web_auto.pool.close()
+        web_auto.locator_cache.flush()
+        pager.close()
+        password_manager.close()
 
     while True:
         try:
-            event, values = window.read(timeout=100)
+            # Block until the next event; only a pending strength refresh
+            # needs a timeout, which doubles as the typing debounce
+            event, values = window.read(timeout=STRENGTH_DEBOUNCE_MS if strength_pending else None)
             
             if event == sg.WIN_CLOSED or event == 'Exit':
                 break
+            
+            elif event == sg.TIMEOUT_EVENT:
+                if strength_pending:
+                    strength_pending = False
+                    show_strength(values['-PASSWORD-'])
+            
+            elif event == '-PASSWORD-':
+                strength_pending = True
                 
             elif event == '-SEARCH-' or event == '-CATEGORY-':
                 search_query = values['-SEARCH-']
                 category = values['-CATEGORY-']
                 update_list(search_query, category)
             
+            elif event == '-RESULTS-':
+                if pager.category:
+                    update_status(lang.get("category_filter").format(pager.total, pager.category))
+                elif pager.query:
+                    update_status(lang.get("search_results").format(pager.total))
+                show_page()
+            
+            elif event == '-PREV-PAGE-':
+                if pager.previous_page():
+                    show_page()
+            
+            elif event == '-NEXT-PAGE-':
+                if pager.next_page():
+                    show_page()
+            
             elif event == '-LIST-':
                 if values['-LIST-']:
                     current_service = values['-LIST-'][0]
@@ -258,12 +386,8 @@ def run_main_window(window, lang, master_password):
                         window['-PASSWORD-'].update(entry.password)
                         window['-URL-'].update(entry.url)
                         window['-NEW-CATEGORY-'].update(entry.category)
-                        
-                        # Update password strength
-                        score, _, _, feedback = password_manager.strength_checker.check_strength(entry.password)
-                        window['-STRENGTH-BAR-'].update(score)
-                        window['-STRENGTH-'].update(get_strength_text(score, lang))
-                        window['-FEEDBACK-'].update(feedback)
+                        strength_pending = False
+                        show_strength(entry.password)
             
             elif event == lang.get("generate"):
                 password = password_manager.generate_password()
@@ -271,10 +395,8 @@ def run_main_window(window, lang, master_password):
                 update_status(lang.get("password_generated"))
                 
                 # Update strength for generated password
-                score, _, _, feedback = password_manager.strength_checker.check_strength(password)
-                window['-STRENGTH-BAR-'].update(score)
-                window['-STRENGTH-'].update(get_strength_text(score, lang))
-                window['-FEEDBACK-'].update(feedback)
+                strength_pending = False
+                show_strength(password)
             
             elif event == '-TOGGLE-PASS-':
                 show_password = not show_password
@@ -295,15 +417,8 @@ def run_main_window(window, lang, master_password):
                     update_status(lang.get("service_exists").format(service), True)
                     continue
                 
-                if password_manager.add_password(service, username, password, url, category):
-                    update_status(lang.get("password_added").format(service))
-                    update_list()
-                    window['-SERVICE-'].update('')
-                    window['-USERNAME-'].update('')
-                    window['-PASSWORD-'].update('')
-                    window['-URL-'].update('')
-                else:
-                    update_status(lang.get("error_occurred"), True)
+                start_task("add", add_entry, service, username, password, url, category,
+                           writes_vault=True)
             
             elif event == lang.get("update"):
                 if not current_service:
@@ -320,11 +435,8 @@ def run_main_window(window, lang, master_password):
                     update_status(lang.get("fill_required"), True)
                     continue
                 
-                if password_manager.delete_password(current_service):
-                    if password_manager.add_password(service, username, password, url, category):
-                        update_status(lang.get("password_updated").format(service))
-                        current_service = service
-                        update_list()
+                start_task("update", update_entry, current_service, service, username, password,
+                           url, category, writes_vault=True)
             
             elif event == lang.get("delete"):
                 if not current_service:
@@ -333,14 +445,7 @@ def run_main_window(window, lang, master_password):
                 
                 if sg.popup_yes_no(lang.get("confirm_delete").format(current_service),
                                  title=lang.get("confirm_delete")) == 'Yes':
-                    if password_manager.delete_password(current_service):
-                        update_status(lang.get("password_deleted").format(current_service))
-                        update_list()
-                        window['-SERVICE-'].update('')
-                        window['-USERNAME-'].update('')
-                        window['-PASSWORD-'].update('')
-                        window['-URL-'].update('')
-                        current_service = None
+                    start_task("delete", delete_entry, current_service, writes_vault=True)
             
             elif event == lang.get("copy_user"):
                 if not values['-USERNAME-']:
@@ -361,7 +466,7 @@ def run_main_window(window, lang, master_password):
                     update_status(lang.get("enter_url"), True)
                     continue
                 update_status(lang.get("url_opened").format(current_service))
-                web_auto.open_url(values['-URL-'])
+                start_task("test_url", web_auto.test_login_form, values['-URL-'])
             
             elif event == lang.get("auto_fill"):
                 if not current_service or not values['-URL-']:
@@ -371,28 +476,128 @@ def run_main_window(window, lang, master_password):
                 entry = password_manager.get_password_entry(current_service)
                 if entry:
                     update_status(lang.get("auto_fill_started").format(current_service))
-                    web_auto.auto_fill(entry.url, entry.username, entry.password)
+                    start_task("auto_fill", web_auto.fill_login_form, entry.url, entry.username,
+                               entry.password)
                 else:
                     update_status(lang.get("service_not_found"), True)
             
+            elif event == lang.get("export"):
+                backup_file = sg.popup_get_file(lang.get("select_backup_file"), save_as=True,
+                                                default_extension='.pmbak',
+                                                file_types=(("Backups", "*.pmbak"),))
+                if not backup_file:
+                    continue
+                start_task("export", VaultBackup(password_manager).export, backup_file,
+                           writes_vault=True)
+            
+            elif event == lang.get("import"):
+                import_file = sg.popup_get_file(lang.get("select_import_file"),
+                                                file_types=(("Exports", "*.csv *.json *.pmbak"),))
+                if not import_file:
+                    continue
+                start_task("import", import_entries, import_file, writes_vault=True, pass_task=True)
+            
+            elif event == '-CANCEL-TASK-':
+                # Queued add/update/delete saves still go through
+                runner.cancel_cancellable()
+            
+            elif event == TaskRunner.PROGRESS_EVENT:
+                _, message, fraction = values[event]
+                if message:
+                    update_status(message)
+                if fraction is not None:
+                    window['-TASK-BAR-'].update(int(fraction * 100))
+            
+            elif event == TaskRunner.DONE_EVENT:
+                outcome = values[event]
+                window['-TASK-BAR-'].update(0)
+                if not runner.busy():
+                    window['-CANCEL-TASK-'].update(disabled=True)
+                
+                if outcome.cancelled:
+                    update_status(lang.get("task_cancelled"), True)
+                    if outcome.name == "import":
+                        # Chunks committed before the cancel stay imported
+                        update_list(values['-SEARCH-'], values['-CATEGORY-'], vault_changed=True)
+                elif outcome.error is not None:
+                    update_status(f'{lang.get("error_occurred")} {outcome.error}', True)
+                elif outcome.name in ("auto_fill", "test_url"):
+                    update_status(outcome.result.message, not outcome.result.success)
+                elif outcome.name == "export":
+                    update_status(lang.get("export_done").format(outcome.result))
+                elif outcome.name == "import":
+                    update_status(outcome.result)
+                    update_list(values['-SEARCH-'], values['-CATEGORY-'], vault_changed=True)
+                else:
+                    service, ok = outcome.result
+                    if not ok:
+                        update_status(lang.get("error_occurred"), True)
+                    elif outcome.name == "add":
+                        update_status(lang.get("password_added").format(service))
+                        update_list(vault_changed=True)
+                        clear_form()
+                    elif outcome.name == "update":
+                        update_status(lang.get("password_updated").format(service))
+                        current_service = service
+                        update_list(vault_changed=True)
+                    elif outcome.name == "delete":
+                        update_status(lang.get("password_deleted").format(service))
+                        update_list(vault_changed=True)
+                        clear_form()
+                        current_service = None
+            
             elif event == lang.get("logout"):
                 if sg.popup_yes_no(lang.get("confirm_logout"), title=lang.get("logout")) == 'Yes':
                     update_status(lang.get("logout_successful"))
+                    # The next login opens the same vault files, so this
+                    # session's storage must be closed first
+                    close_session()
                     window.close()
                     main()
-            
-            # Update password strength when typing
-            if values.get('-PASSWORD-'):
-                password = values['-PASSWORD-']
-                score, _, _, feedback = password_manager.strength_checker.check_strength(password)
-                window['-STRENGTH-BAR-'].update(score)
-                window['-STRENGTH-'].update(get_strength_text(score, lang))
-                window['-FEEDBACK-'].update(feedback)
+                    return
         
         except Exception as e:
             sg.popup_error(f'{lang.get("error_occurred")} {str(e)}')
             continue
     
+    close_session()
+    window.close()
+
+def run_recovery_window(lang, security, vault_key):
+    """
+    Store the vault key with security answers saved by an older version,
+    which kept only the answers. Until then "Forgot password" cannot
+    recover a vault whose key is wrapped, so this is asked at every login
+    until the answers are given.
+    """
+    window = create_recovery_window(lang)
+    while True:
+        event, values = window.read()
+        
+        if event == sg.WIN_CLOSED or event == lang.get("skip"):
+            break
+        
+        if event == lang.get("save_answers"):
+            answers = [values['-ANSWER1-'], values['-ANSWER2-'], values['-ANSWER3-']]
+            if not all(answers):
+                sg.popup(lang.get("answer_required"), title=lang.get("error_occurred"))
+                continue
+            window[lang.get("save_answers")].update(disabled=True)
+            security.escrow_vault_key_async(answers, vault_key, callback=lambda future: window.write_event_value(
+                '-ESCROWED-', future.result() if future.exception() is None else "error"))
+            continue
+        
+        if event == '-ESCROWED-':
+            window[lang.get("save_answers")].update(disabled=False)
+            result = values['-ESCROWED-']
+            if result == "saved":
+                sg.popup(lang.get("recovery_enabled"))
+                break
+            elif result == "incorrect_answers":
+                sg.popup(lang.get("incorrect_answers"), title=lang.get("error_occurred"))
+            else:
+                sg.popup(lang.get("error_occurred"), title=lang.get("error_occurred"))
+    
     window.close()
 
 def check_master_password(password: str) -> bool:
@@ -412,6 +617,31 @@ def main():
     lang = Language(is_finnish=False)
     security = SecurityQuestions()
     
+    def reset_with_answers(checked, answers, new_pass) -> str:
+        """
+        Finish a reset once check_answers is done; runs on the security
+        worker. Always returns a result, so -RESET-DONE- is always posted.
+        """
+        try:
+            if checked.exception() is not None:
+                return "recovery_unavailable"
+            verified, vault_key = checked.result()
+            if not verified:
+                return "incorrect_answers"
+            # Re-wrap the vault key under the new password
+            password_manager = PasswordManager()
+            escrowed = vault_key is not None
+            vault_key = vault_key or password_manager.master_key.unwrapped_key()
+            if not password_manager.reset_master_password(new_pass, vault_key):
+                return "recovery_unavailable"
+            if not escrowed:
+                # Answers saved before the key was escrowed; store it now
+                security.save_answers(answers, vault_key)
+            return "reset"
+        except Exception as e:
+            print(f"Error resetting master password: {str(e)}")
+            return "error"
+    
     # Check if first time setup is needed
     if security.is_setup_needed():
         setup_window = create_security_setup_window(lang)
@@ -436,12 +666,21 @@ def main():
                     sg.popup(lang.get("answer_required"), title=lang.get("error_occurred"))
                     continue
                     
-                if security.save_answers(answers):
+                # Escrow the vault key with the answers before the first
+                # login wraps it under the master password
+                vault_key = PasswordManager().ensure_vault_key()
+                setup_window[lang.get("save_answers")].update(disabled=True)
+                security.save_answers_async(answers, vault_key, callback=lambda future: setup_window.write_event_value(
+                    '-ANSWERS-SAVED-', future.exception() is None and future.result()))
+                continue
+            
+            if event == '-ANSWERS-SAVED-':
+                if values['-ANSWERS-SAVED-']:
                     setup_window.close()
                     break
-                else:
-                    sg.popup(lang.get("error_occurred"), title=lang.get("error_occurred"))
-                    continue
+                setup_window[lang.get("save_answers")].update(disabled=False)
+                sg.popup(lang.get("error_occurred"), title=lang.get("error_occurred"))
+                continue
     
     window = create_window(lang)
     
@@ -493,16 +732,28 @@ def main():
                         sg.popup(lang.get("master_password_weak"), title=lang.get("error_occurred"))
                         continue
                         
-                    if security.verify_answers(answers):
-                        # Initialize password manager with new password
-                        password_manager = PasswordManager()
-                        if password_manager.initialize(new_pass):
-                            sg.popup(lang.get("password_reset_success"))
-                            reset_window.close()
-                            window.un_hide()
-                            break
-                    else:
+                    # Verification and re-wrapping both derive keys, so they
+                    # run on a worker and report back through -RESET-DONE-
+                    reset_window[lang.get("submit_answers")].update(disabled=True)
+                    security.check_answers_async(
+                        answers, callback=lambda future, answers=answers, new_pass=new_pass:
+                        reset_window.write_event_value('-RESET-DONE-', reset_with_answers(future, answers, new_pass)))
+                    continue
+                
+                if reset_event == '-RESET-DONE-':
+                    reset_window[lang.get("submit_answers")].update(disabled=False)
+                    result = reset_values['-RESET-DONE-']
+                    if result == "reset":
+                        sg.popup(lang.get("password_reset_success"))
+                        reset_window.close()
+                        window.un_hide()
+                        break
+                    elif result == "incorrect_answers":
                         sg.popup(lang.get("incorrect_answers"), title=lang.get("error_occurred"))
+                    elif result == "recovery_unavailable":
+                        sg.popup(lang.get("recovery_unavailable"), title=lang.get("error_occurred"))
+                    else:
+                        sg.popup(lang.get("error_occurred"), title=lang.get("error_occurred"))
             
             continue
             
@@ -516,15 +767,28 @@ def main():
                 sg.popup(lang.get("master_password_weak"), title=lang.get("error_occurred"))
                 continue
             
-            # Initialize password manager
-            password_manager = PasswordManager()
-            if not password_manager.initialize(master_password):
-                sg.popup(lang.get("master_password_weak"), title=lang.get("error_occurred"))
+            # Initialize password manager; key derivation runs on a worker
+            # thread and reports back through the -UNLOCKED- event
+            password_manager = PasswordManager(lazy_decrypt=True)
+            window[lang.get("login")].update(disabled=True)
+            password_manager.initialize_async(master_password).add_done_callback(
+                lambda future: window.write_event_value(
+                    '-UNLOCKED-', future.exception() is None and future.result()))
+            continue
+        
+        if event == '-UNLOCKED-':
+            window[lang.get("login")].update(disabled=False)
+            if not values['-UNLOCKED-']:
+                sg.popup(lang.get("wrong_master_password"), title=lang.get("error_occurred"))
                 continue
             
             window.close()
+            # Answers from before the vault key was stored with them
+            # can't recover a wrapped key; store it while it is unlocked
+            if security.needs_key_escrow():
+                run_recovery_window(lang, security, password_manager.vault_key)
             main_window = create_main_window(lang)
-            run_main_window(main_window, lang, master_password)
+            run_main_window(main_window, lang, password_manager)
             break
     
     window.close()
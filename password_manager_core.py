@@ -1,133 +1,445 @@
 from cryptography.fernet import Fernet
-import json
-import os
 import time
-import secrets
-import string
-from typing import Optional, Dict
-from dataclasses import dataclass
+import sys
+import threading
+from collections import OrderedDict, deque
+from collections.abc import Mapping
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Optional, Dict, Iterable, List, Set, Tuple
+from dataclasses import dataclass, field, replace
 from password_strength import PasswordStrengthChecker
+from password_generator import PasswordGenerator, PasswordPolicy
+from vault_storage import JournaledVaultStorage, SQLiteVaultStorage
+from search_index import TrigramIndex, CategoryIndex
+from key_derivation import MasterKey
 
-@dataclass
+@dataclass(slots=True)
 class PasswordEntry:
+    # Slotted: large vaults hold one of these per service
     username: str
     password: str
     url: str = ""
     category: str = "General"
-    created_date: float = time.time()
-    last_modified: float = time.time()
+    created_date: float = field(default_factory=time.time)
+    last_modified: float = field(default_factory=time.time)
+
+class PlaintextCache:
+    """
+    Size- and TTL-bounded LRU cache of decrypted passwords.
+
+    Safe to use from several threads. Expired plaintexts are dropped on
+    every get and put, not only when their own service is read again.
+    """
+
+    def __init__(self, max_size: int = 128, ttl: float = 300):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._items: OrderedDict = OrderedDict()
+        # (expires, service) in put order; expiry times only grow, so the
+        # expired ones are always at the front
+        self._expiry: deque = deque()
+        self.lock = threading.Lock()
+
+    def _purge(self):
+        now = time.monotonic()
+        while self._expiry and self._expiry[0][0] <= now:
+            expires, service = self._expiry.popleft()
+            item = self._items.get(service)
+            # Skip stale records of services that were put again since
+            if item is not None and item[1] == expires:
+                del self._items[service]
+
+    def get(self, service: str) -> Optional[str]:
+        with self.lock:
+            self._purge()
+            item = self._items.get(service)
+            if item is None:
+                return None
+            self._items.move_to_end(service)
+            return item[0]
+
+    def put(self, service: str, password: str):
+        with self.lock:
+            self._purge()
+            expires = time.monotonic() + self.ttl
+            self._items[service] = (password, expires)
+            self._items.move_to_end(service)
+            self._expiry.append((expires, service))
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def invalidate(self, service: str):
+        with self.lock:
+            self._items.pop(service, None)
+
+    def clear(self):
+        with self.lock:
+            self._items.clear()
+            self._expiry.clear()
+
+class StoredEntries(Mapping):
+    """Read-only mapping view over the entries of a database-backed vault."""
+
+    def __init__(self, storage: SQLiteVaultStorage, to_entry):
+        self.storage = storage
+        self.to_entry = to_entry
+
+    def __getitem__(self, service: str) -> PasswordEntry:
+        record = self.storage.get(service)
+        if record is None:
+            raise KeyError(service)
+        return self.to_entry(record)
+
+    def __contains__(self, service) -> bool:
+        return self.storage.get(service) is not None
+
+    def __iter__(self):
+        return self.storage.services()
+
+    def __len__(self) -> int:
+        return self.storage.count()
 
 class PasswordManager:
-    def __init__(self):
+    def __init__(self, lazy_decrypt: bool = False, cache_size: int = 128, cache_ttl: float = 300,
+                 storage_engine: str = "json", kdf_algorithm: str = "pbkdf2", unlock_seconds: float = 0.5):
         self.key_file = "key.key"
         self.password_file = "passwords.json"
+        self.db_file = "passwords.db"
         self.fernet = None
-        self.password_dict: Dict[str, PasswordEntry] = {}
+        # The unwrapped data key, kept for the session so it can be stored
+        # with security answers that were saved without it
+        self.vault_key: Optional[bytes] = None
+        # The data key is wrapped with a key derived from the master password;
+        # KDF costs are calibrated to take about unlock_seconds here.
+        self.master_key = MasterKey(self.key_file, kdf_algorithm, unlock_seconds)
         self.last_activity = time.time()
         self.strength_checker = PasswordStrengthChecker()
+        self.password_generator = PasswordGenerator()
+        self.storage_engine = storage_engine
+        if storage_engine == "sqlite":
+            self.storage = SQLiteVaultStorage(self.db_file, self.password_file)
+            # Entries stay in the database and are only read on access
+            self.password_dict = StoredEntries(self.storage, self._entry_from_record)
+            lazy_decrypt = True
+        else:
+            self.storage = JournaledVaultStorage(self.password_file)
+            self.password_dict: Dict[str, PasswordEntry] = {}
+        # In lazy mode password_dict only holds metadata; plaintexts are
+        # decrypted on demand and kept in a bounded cache.
+        self.lazy_decrypt = lazy_decrypt
+        self.plaintext_cache = PlaintextCache(cache_size, cache_ttl)
+        # Ciphertext matching each entry's current password, and the services
+        # changed since the last save; only those are written back.
+        self._ciphertexts: Dict[str, str] = {}
+        self._dirty = set()
+        self._batch_depth = 0
+        self.search_index = TrigramIndex()
+        self.category_index = CategoryIndex()
         
     def initialize(self, master_password: str) -> bool:
         if not self._validate_master_password(master_password):
             return False
-            
-        if os.path.exists(self.key_file):
-            with open(self.key_file, "rb") as f:
-                key = f.read()
-        else:
-            key = Fernet.generate_key()
-            with open(self.key_file, "wb") as f:
-                f.write(key)
+        
+        # Derived once per session; the unwrapped key stays in self.fernet
+        key = self.master_key.unlock(master_password)
+        if key is None:
+            return False
         
         self.fernet = Fernet(key)
+        self.vault_key = key
         self._load_passwords()
         return True
     
+    def initialize_async(self, master_password: str) -> Future:
+        """Run initialize on a worker thread so key derivation doesn't block the GUI."""
+        executor = ThreadPoolExecutor(max_workers=1)
+        future = executor.submit(self.initialize, master_password)
+        executor.shutdown(wait=False)
+        return future
+    
+    def ensure_vault_key(self) -> Optional[bytes]:
+        """Create the vault key if needed; returned only while not yet wrapped."""
+        return self.master_key.ensure_key()
+    
+    def reset_master_password(self, new_password: str, vault_key: Optional[bytes] = None) -> bool:
+        """
+        Re-wrap the vault key with a new master password. vault_key is the
+        escrowed key recovered through the security questions; vaults whose
+        key was never wrapped can be reset without it.
+        """
+        if not self._validate_master_password(new_password):
+            return False
+        vault_key = vault_key or self.master_key.unwrapped_key()
+        if vault_key is None:
+            return False
+        try:
+            Fernet(vault_key)
+        except ValueError:
+            return False
+        self.master_key.wrap(new_password, vault_key)
+        return True
+    
     def _validate_master_password(self, password: str) -> bool:
         score, _, _, _ = self.strength_checker.check_strength(password)
         return score >= 50
     
     def _load_passwords(self):
-        if os.path.exists(self.password_file):
-            try:
-                with open(self.password_file, "r") as f:
-                    encrypted_data = json.load(f)
-                    for service, entry in encrypted_data.items():
-                        decrypted_pass = self.fernet.decrypt(entry["password"].encode()).decode()
-                        self.password_dict[service] = PasswordEntry(
-                            username=entry["username"],
-                            password=decrypted_pass,
-                            url=entry.get("url", ""),
-                            category=entry.get("category", "General"),
-                            created_date=entry.get("created_date", time.time()),
-                            last_modified=entry.get("last_modified", time.time())
-                        )
-            except Exception as e:
-                print(f"Error loading passwords: {str(e)}")
+        try:
+            if self.storage_engine == "sqlite":
+                self.storage.load()
+                return
+            for service, entry in self.storage.load().items():
+                if self.lazy_decrypt:
+                    decrypted_pass = ""
+                else:
+                    decrypted_pass = self._decrypt(entry["password"])
+                self._ciphertexts[service] = entry["password"]
+                self.password_dict[service] = self._entry_from_record(entry, decrypted_pass)
+                self._index_entry(service, self.password_dict[service])
+        except Exception as e:
+            print(f"Error loading passwords: {str(e)}")
+    
+    @staticmethod
+    def _entry_from_record(record: dict, password: str = "") -> PasswordEntry:
+        return PasswordEntry(
+            username=record["username"],
+            password=password,
+            url=record.get("url", ""),
+            category=sys.intern(record.get("category", "General")),
+            created_date=record.get("created_date", time.time()),
+            last_modified=record.get("last_modified", time.time())
+        )
+    
+    def _index_entry(self, service: str, entry: PasswordEntry):
+        self.search_index.add(service, entry.username, entry.url, entry.category)
+        self.category_index.add(service, entry.category)
+    
+    def _decrypt(self, token: str) -> str:
+        return self.fernet.decrypt(token.encode()).decode()
+    
+    def _encrypt(self, plaintext: str) -> str:
+        return self.fernet.encrypt(plaintext.encode()).decode()
+    
+    def _build_record(self, entry: PasswordEntry, ciphertext: str) -> dict:
+        return {
+            "username": entry.username,
+            "password": ciphertext,
+            "url": entry.url,
+            "category": entry.category,
+            "created_date": entry.created_date,
+            "last_modified": entry.last_modified
+        }
     
     def _save_passwords(self):
-        encrypted_data = {}
-        for service, entry in self.password_dict.items():
-            encrypted_data[service] = {
-                "username": entry.username,
-                "password": self.fernet.encrypt(entry.password.encode()).decode(),
-                "url": entry.url,
-                "category": entry.category,
-                "created_date": entry.created_date,
-                "last_modified": entry.last_modified
-            }
-        with open(self.password_file, "w") as f:
-            json.dump(encrypted_data, f, indent=4)
+        """Persist the entries changed since the last save in one write."""
+        if self._batch_depth or not self._dirty:
+            return
+        puts = {}
+        deletes = []
+        for service in self._dirty:
+            entry = self.password_dict.get(service)
+            if entry is None:
+                deletes.append(service)
+            else:
+                puts[service] = self._build_record(entry, self._ciphertexts[service])
+        if len(puts) + len(deletes) == 1:
+            if puts:
+                self.storage.put(*puts.popitem())
+            else:
+                self.storage.delete(deletes[0])
+        else:
+            self.storage.apply(puts, deletes)
+        self._dirty.clear()
+    
+    @contextmanager
+    def batch(self):
+        """
+        Apply many mutations and persist them with a single write.
+
+        With the SQLite engine the batch is one transaction and is rolled
+        back if the block raises; the JSON engine persists whatever was
+        already applied in memory.
+        """
+        if self.storage_engine == "sqlite":
+            try:
+                with self.storage.transaction():
+                    yield self
+            except BaseException:
+                self.plaintext_cache.clear()
+                raise
+            return
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            self._save_passwords()
+    
+    def _current_plaintext(self, service: str) -> Optional[str]:
+        """Plaintext behind the stored ciphertext, if known without decrypting."""
+        if self.lazy_decrypt:
+            return self.plaintext_cache.get(service)
+        entry = self.password_dict.get(service)
+        return entry.password if entry is not None else None
+    
+    def _ciphertext(self, service: str) -> str:
+        if self.storage_engine == "sqlite":
+            return self.storage.get(service)["password"]
+        return self._ciphertexts[service]
+    
+    def _store_entry(self, service: str, entry: PasswordEntry, ciphertext: str):
+        if self.storage_engine == "sqlite":
+            self.storage.put(service, self._build_record(entry, ciphertext))
+            return
+        self._ciphertexts[service] = ciphertext
+        self.password_dict[service] = entry
+        self._index_entry(service, entry)
+        self._dirty.add(service)
+        self._save_passwords()
+    
+    def _remove_entry(self, service: str):
+        if self.storage_engine == "sqlite":
+            self.storage.delete(service)
+            return
+        del self.password_dict[service]
+        self.search_index.remove(service)
+        self.category_index.remove(service)
+        self._ciphertexts.pop(service, None)
+        self._dirty.add(service)
+        self._save_passwords()
     
     def add_password(self, service: str, username: str, password: str, url: str = "", category: str = "General") -> bool:
         try:
-            self.password_dict[service] = PasswordEntry(
+            entry = PasswordEntry(
                 username=username,
                 password=password,
                 url=url,
-                category=category
+                category=sys.intern(category)
             )
-            self._save_passwords()
+            # Keep the existing ciphertext when only metadata changed
+            if self._current_plaintext(service) == password:
+                ciphertext = self._ciphertext(service)
+            else:
+                ciphertext = self._encrypt(password)
+            if self.lazy_decrypt:
+                entry = replace(entry, password="")
+            self._store_entry(service, entry, ciphertext)
+            if self.lazy_decrypt:
+                self.plaintext_cache.put(service, password)
             return True
         except Exception as e:
             print(f"Error adding password: {str(e)}")
             return False
     
+    def add_entries(self, entries: Iterable[Tuple[str, PasswordEntry]], executor=None) -> int:
+        """
+        Add many entries with a single write. Passwords are encrypted on
+        executor (any concurrent.futures executor) when one is given.
+        """
+        entries = list(entries)
+        passwords = [entry.password for _, entry in entries]
+        if executor is not None:
+            ciphertexts = executor.map(self._encrypt, passwords)
+        else:
+            ciphertexts = map(self._encrypt, passwords)
+        with self.batch():
+            for (service, entry), ciphertext in zip(entries, ciphertexts):
+                if self.lazy_decrypt:
+                    entry = replace(entry, password="")
+                self._store_entry(service, entry, ciphertext)
+                self.plaintext_cache.invalidate(service)
+        return len(entries)
+    
+    def add_records(self, records: Iterable[Tuple[str, dict]]) -> int:
+        """Add already-encrypted storage records (e.g. from a backup) in one write."""
+        count = 0
+        with self.batch():
+            for service, record in records:
+                password = "" if self.lazy_decrypt else self._decrypt(record["password"])
+                self._store_entry(service, self._entry_from_record(record, password), record["password"])
+                self.plaintext_cache.invalidate(service)
+                count += 1
+        return count
+    
+    def iter_records(self) -> Iterable[Tuple[str, dict]]:
+        """Stream the persisted, encrypted records of the vault."""
+        self._save_passwords()
+        return self.storage.iter_records()
+    
+    def decrypt_password(self, token: str) -> str:
+        """Decrypt a stored token, such as one from iter_records, bypassing the plaintext cache."""
+        return self._decrypt(token)
+    
     def get_password_entry(self, service: str) -> Optional[PasswordEntry]:
-        return self.password_dict.get(service)
+        entry = self.password_dict.get(service)
+        if entry is None or not self.lazy_decrypt:
+            return entry
+        password = self.plaintext_cache.get(service)
+        if password is None:
+            password = self._decrypt(self._ciphertext(service))
+            self.plaintext_cache.put(service, password)
+        return replace(entry, password=password)
     
     def delete_password(self, service: str) -> bool:
         try:
             if service in self.password_dict:
-                del self.password_dict[service]
-                self._save_passwords()
+                self._remove_entry(service)
+                self.plaintext_cache.invalidate(service)
                 return True
             return False
         except Exception as e:
             print(f"Error deleting password: {str(e)}")
             return False
     
+    def close(self):
+        """Flush pending vault compaction and release storage files."""
+        self.plaintext_cache.clear()
+        self.vault_key = None
+        self.storage.close()
+    
     def generate_password(self, length: int = 16) -> str:
         try:
-            chars = string.ascii_letters + string.digits + "!@#$%^&*"
-            while True:
-                password = ''.join(secrets.choice(chars) for _ in range(length))
-                score, _, _, _ = self.strength_checker.check_strength(password)
-                if score >= 80:  # Only return strong passwords
-                    return password
+            # Every character class is present by construction, so lengths
+            # of 7 or more always score >= 80 without a retry loop
+            return self.password_generator.generate(PasswordPolicy(length=length))
         except Exception as e:
             print(f"Error generating password: {str(e)}")
             return ""
     
+    def generate_many(self, n: int, length: Optional[int] = None, policy: Optional[PasswordPolicy] = None) -> list:
+        return self.password_generator.generate_many(n, length, policy)
+    
     def get_categories(self) -> list:
-        return sorted(list(set(entry.category for entry in self.password_dict.values())))
+        if self.storage_engine == "sqlite":
+            return self.storage.categories()
+        return self.category_index.categories()
     
-    def search_passwords(self, query: str) -> Dict[str, PasswordEntry]:
-        query = query.lower()
-        return {
-            service: entry
-            for service, entry in self.password_dict.items()
-            if query in service.lower() or
-               query in entry.username.lower() or
-               query in entry.url.lower() or
-               query in entry.category.lower()
-        }
+    def search_passwords(self, query: str, category: Optional[str] = None) -> Dict[str, PasswordEntry]:
+        if self.storage_engine == "sqlite":
+            return {
+                service: self._entry_from_record(record)
+                for service, record in self.storage.search(query, category)
+            }
+        return {service: self.password_dict[service] for service in self.search_services(query, category)}
+    
+    def search_services(self, query: str, category: Optional[str] = None,
+                        within: Optional[Set[str]] = None) -> List[str]:
+        """
+        Names of the services search_passwords would return, in vault order,
+        without building their entries. within restricts the search to an
+        earlier result, e.g. while a search query is being extended.
+        """
+        if self.storage_engine == "sqlite":
+            services = self.storage.search_services(query, category)
+            if within is not None:
+                services = [service for service in services if service in within]
+            return services
+        if category is not None:
+            category_services = self.category_index.get(category)
+            within = category_services if within is None else within & category_services
+        if within is None:
+            return self.search_index.search(query)
+        if query:
+            return self.search_index.search(query, within=within)
+        return self.search_index.sort_services(within)
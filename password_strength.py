@@ -1,48 +1,92 @@
-import re
-from typing import Tuple
+import string
+from typing import Iterable, List, Tuple
 
 class PasswordStrengthChecker:
     def __init__(self):
         self.min_length = 8
         self.special_chars = "!@#$%^&*()_+-=[]{}|;:,.<>?"
+        self._digits = frozenset(string.digits)
+        self._lowercase = frozenset(string.ascii_lowercase)
+        self._uppercase = frozenset(string.ascii_uppercase)
+        # Memoized results, per (min_length, special_chars) setting
+        self._results = {}
     
     def check_strength(self, password: str) -> Tuple[int, str, str]:
         """
         Check password strength and return a score (0-100), strength level, and feedback.
         """
+        return self.check_strength_many((password,))[0]
+
+    def check_strength_many(self, passwords: Iterable[str]) -> List[Tuple[int, str, str, str]]:
+        """
+        Check many passwords at once, e.g. for a vault-wide audit.
+        Each result is identical to check_strength for that password.
+        """
+        # The result only depends on the length (up to a cap), the character
+        # classes present and the distinct character count (up to 10), so it
+        # is memoized on those features. Each password is scanned once to
+        # build its character set; the class tests only touch that set.
+        length_cap = max(10, self.min_length)
+        digits, lowercase, uppercase = self._digits, self._lowercase, self._uppercase
+        special = frozenset(self.special_chars)
+        results = self._results.setdefault((self.min_length, self.special_chars), {})
+        checked = []
+        append = checked.append
+        for password in passwords:
+            chars = set(password)
+            length = len(password)
+            if password.isascii():
+                has_digit = not chars.isdisjoint(digits)
+            else:
+                # Same as the \d regex class: any Unicode decimal digit
+                has_digit = any(c.isdecimal() for c in chars)
+            unique = len(chars)
+            key = (
+                length if length < length_cap else length_cap,
+                has_digit,
+                not chars.isdisjoint(lowercase),
+                not chars.isdisjoint(uppercase),
+                not chars.isdisjoint(special),
+                unique if unique < 10 else 10,
+            )
+            result = results.get(key)
+            if result is None:
+                result = results[key] = self._build_result(*key)
+            append(result)
+        return checked
+
+    def _build_result(self, length: int, has_digit: bool, has_lower: bool, has_upper: bool,
+                      has_special: bool, variety_score: int) -> Tuple[int, str, str, str]:
         score = 0
         feedback = []
         
         # Length check (up to 30 points)
-        length_score = min(len(password) * 3, 30)
-        score += length_score
-        if len(password) < self.min_length:
+        score += min(length * 3, 30)
+        if length < self.min_length:
             feedback.append(f"Password should be at least {self.min_length} characters")
         
         # Complexity checks (up to 70 points)
-        if re.search(r"\d", password):
+        if has_digit:
             score += 15
         else:
             feedback.append("Add numbers")
             
-        if re.search(r"[a-z]", password):
+        if has_lower:
             score += 15
         else:
             feedback.append("Add lowercase letters")
             
-        if re.search(r"[A-Z]", password):
+        if has_upper:
             score += 15
         else:
             feedback.append("Add uppercase letters")
             
-        if any(c in self.special_chars for c in password):
+        if has_special:
             score += 15
         else:
             feedback.append("Add special characters")
             
         # Variety bonus (up to 10 points)
-        unique_chars = len(set(password))
-        variety_score = min(unique_chars, 10)
         score += variety_score
         
         # Determine strength level
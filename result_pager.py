@@ -0,0 +1,105 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, List, Optional
+from password_manager_core import PasswordManager
+
+
+class ResultPager:
+    """
+    Paged view over vault search results for the service list.
+
+    Searches return service names only, run on a worker thread, and only
+    one page of names is handed to the list widget at a time. A newer
+    search supersedes any older one still queued or running. When the
+    query only grows (the user keeps typing), the new search is limited
+    to the previous results instead of the whole vault; those are already
+    in vault order, so nothing is re-sorted.
+    """
+
+    def __init__(self, manager: PasswordManager, page_size: int = 200,
+                 vault_lock: Optional[threading.RLock] = None):
+        self.manager = manager
+        self.page_size = page_size
+        # Held while searching, so a search never sees a half-applied write
+        self.vault_lock = vault_lock or threading.RLock()
+        self.results: List[str] = []
+        self.page = 0
+        self.query = ""
+        self.category: Optional[str] = None
+        # Whether self.results still reflects the vault contents
+        self._valid = False
+        self._generation = 0
+        self._pending: Optional[Future] = None
+        self.lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+    def search(self, query: str, category: Optional[str] = None,
+               callback: Optional[Callable[[Future], None]] = None) -> Future:
+        """
+        Start a search. The future resolves to the number of matches, or
+        None if a newer search superseded this one.
+        """
+        with self.lock:
+            self._generation += 1
+            generation = self._generation
+            if self._pending is not None:
+                self._pending.cancel()
+            future = self._executor.submit(self._run, generation, query, category)
+            self._pending = future
+        if callback is not None:
+            future.add_done_callback(callback)
+        return future
+
+    def _run(self, generation: int, query: str, category: Optional[str]) -> Optional[int]:
+        with self.lock:
+            if generation != self._generation:
+                return None
+            within = None
+            if self._valid and category == self.category and self.query.lower() in query.lower():
+                within = set(self.results)
+
+        with self.vault_lock:
+            results = self.manager.search_services(query, category, within)
+
+        with self.lock:
+            if generation != self._generation:
+                return None
+            self.results = results
+            self.query = query
+            self.category = category
+            self.page = 0
+            self._valid = True
+            return len(results)
+
+    def invalidate(self):
+        """Forget the last results after the vault changed."""
+        with self.lock:
+            self._valid = False
+
+    @property
+    def total(self) -> int:
+        return len(self.results)
+
+    @property
+    def page_count(self) -> int:
+        return max(1, -(-len(self.results) // self.page_size))
+
+    def page_items(self) -> List[str]:
+        """Service names on the current page."""
+        start = self.page * self.page_size
+        return self.results[start:start + self.page_size]
+
+    def next_page(self) -> bool:
+        if self.page + 1 >= self.page_count:
+            return False
+        self.page += 1
+        return True
+
+    def previous_page(self) -> bool:
+        if self.page == 0:
+            return False
+        self.page -= 1
+        return True
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
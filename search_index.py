@@ -0,0 +1,149 @@
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+class TrigramIndex:
+    """
+    Incremental trigram index for case-insensitive substring search.
+
+    Matches are the same as checking `query in field.lower()` for any indexed
+    field. Queries shorter than three characters cannot use the index and
+    fall back to scanning the stored fields.
+    """
+
+    def __init__(self):
+        self.postings: Dict[str, Set[str]] = defaultdict(set)
+        self.fields: Dict[str, Tuple[str, ...]] = {}
+        # Insertion sequence, so results come back in vault order
+        self.order: Dict[str, int] = {}
+        self._next_seq = 0
+
+    @staticmethod
+    def _trigrams(text: str) -> Set[str]:
+        return {text[i:i + 3] for i in range(len(text) - 2)}
+
+    def add(self, service: str, *fields: str):
+        """Index (or re-index) the searchable fields of a service."""
+        if service in self.fields:
+            self._unlink(service)
+        else:
+            self.order[service] = self._next_seq
+            self._next_seq += 1
+        lowered = tuple(field.lower() for field in (service,) + fields)
+        self.fields[service] = lowered
+        for text in lowered:
+            for gram in self._trigrams(text):
+                self.postings[gram].add(service)
+
+    def remove(self, service: str):
+        """Drop a service from the index."""
+        if service in self.fields:
+            self._unlink(service)
+            del self.fields[service]
+            del self.order[service]
+
+    def _unlink(self, service: str):
+        for text in self.fields[service]:
+            for gram in self._trigrams(text):
+                posting = self.postings.get(gram)
+                if posting is not None:
+                    posting.discard(service)
+                    if not posting:
+                        del self.postings[gram]
+
+    def sort_services(self, services: Iterable[str]) -> List[str]:
+        """Order services the way they were inserted into the vault."""
+        return sorted(services, key=self.order.__getitem__)
+
+    def search(self, query: str, within: Optional[Set[str]] = None) -> List[str]:
+        """
+        Return matching services in insertion order.
+
+        When within is given, only those services are considered; its
+        postings are intersected along with the query trigrams.
+        """
+        query = query.lower()
+        if len(query) < 3:
+            if within is not None:
+                return self.sort_services(
+                    service for service in within
+                    if any(query in text for text in self.fields[service])
+                )
+            # self.fields is already kept in insertion order
+            return [
+                service for service, texts in self.fields.items()
+                if any(query in text for text in texts)
+            ]
+
+        postings = [] if within is None else [within]
+        for gram in self._trigrams(query):
+            posting = self.postings.get(gram)
+            if not posting:
+                return []
+            postings.append(posting)
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates &= posting
+            if not candidates:
+                return []
+
+        # Trigram hits are only candidates; confirm the real substring match
+        matches = [
+            service for service in candidates
+            if any(query in text for text in self.fields[service])
+        ]
+        return self.sort_services(matches)
+
+    def clear(self):
+        self.postings.clear()
+        self.fields.clear()
+        self.order.clear()
+
+
+class CategoryIndex:
+    """Category to services index with a precomputed sorted category list."""
+
+    def __init__(self):
+        self.services: Dict[str, Set[str]] = {}
+        self.category_of: Dict[str, str] = {}
+        self._sorted_categories: Optional[List[str]] = None
+
+    def add(self, service: str, category: str):
+        """Record (or move) a service under a category."""
+        previous = self.category_of.get(service)
+        if previous == category:
+            return
+        if previous is not None:
+            self.remove(service)
+        self.category_of[service] = category
+        if category not in self.services:
+            self.services[category] = set()
+            self._sorted_categories = None
+        self.services[category].add(service)
+
+    def remove(self, service: str):
+        """Drop a service from its category."""
+        category = self.category_of.pop(service, None)
+        if category is None:
+            return
+        members = self.services[category]
+        members.discard(service)
+        if not members:
+            del self.services[category]
+            self._sorted_categories = None
+
+    def get(self, category: str) -> Set[str]:
+        """Services in a category (empty if the category is unused)."""
+        return self.services.get(category, set())
+
+    def categories(self) -> List[str]:
+        """Sorted list of categories in use."""
+        if self._sorted_categories is None:
+            self._sorted_categories = sorted(self.services)
+        return list(self._sorted_categories)
+
+    def clear(self):
+        self.services.clear()
+        self.category_of.clear()
+        self._sorted_categories = None
@@ -1,79 +1,187 @@
 import json
 import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from cryptography.fernet import Fernet
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 import base64
+from typing import Callable, Optional, Tuple
+from key_derivation import calibrate
 
 class SecurityQuestions:
-    def __init__(self):
+    DEFAULT_ITERATIONS = 100000
+
+    def __init__(self, iterations: Optional[int] = None, target_seconds: Optional[float] = None):
         self.questions_file = 'security_answers.bin'
         self.salt_file = 'security_salt.bin'
-        
-    def _generate_key(self, answers: list) -> bytes:
+        # Iterations used for new answers; calibrated to target_seconds if given
+        if iterations is None:
+            iterations = self.DEFAULT_ITERATIONS
+            if target_seconds is not None:
+                iterations = calibrate("pbkdf2", target_seconds).iterations
+        self.iterations = iterations
+        self.last_derivation_seconds = 0.0
+        self._salt = None
+        # PBKDF2 runs here instead of on the GUI thread
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+    def _load_salt(self) -> bytes:
+        """Load or create the salt, reading the file only once"""
+        if self._salt is None:
+            if os.path.exists(self.salt_file):
+                with open(self.salt_file, 'rb') as f:
+                    self._salt = f.read()
+            else:
+                salt = os.urandom(16)
+                with open(self.salt_file, 'wb') as f:
+                    f.write(salt)
+                self._salt = salt
+        return self._salt
+
+    def _generate_key(self, answers: list, iterations: Optional[int] = None) -> bytes:
         """Generate encryption key from security answers"""
         # Combine all answers into one string
         combined = ''.join(answers).encode()
-        
-        # Load or create salt
-        if os.path.exists(self.salt_file):
-            with open(self.salt_file, 'rb') as f:
-                salt = f.read()
-        else:
-            salt = os.urandom(16)
-            with open(self.salt_file, 'wb') as f:
-                f.write(salt)
-        
+
         # Generate key using PBKDF2
+        start = time.perf_counter()
         kdf = PBKDF2HMAC(
             algorithm=hashes.SHA256(),
             length=32,
-            salt=salt,
-            iterations=100000,
+            salt=self._load_salt(),
+            iterations=iterations or self.iterations,
         )
         key = base64.urlsafe_b64encode(kdf.derive(combined))
+        self.last_derivation_seconds = time.perf_counter() - start
         return key
-        
-    def save_answers(self, answers: list) -> bool:
-        """Save encrypted security question answers"""
+
+    def save_answers(self, answers: list, vault_key: Optional[bytes] = None) -> bool:
+        """Save encrypted security question answers, escrowing the vault key with them"""
         try:
             # Generate key from answers
             key = self._generate_key(answers)
             fernet = Fernet(key)
-            
-            # Encrypt the answers themselves
-            encrypted_data = fernet.encrypt(json.dumps(answers).encode())
-            
+
+            # Encrypt the answers themselves, plus the vault key so a reset
+            # can re-wrap it under a new master password
+            payload = {
+                "answers": answers,
+                "vault_key": vault_key.decode() if vault_key else None
+            }
+            encrypted_data = fernet.encrypt(json.dumps(payload).encode())
+            # escrowed is not secret; it tells needs_key_escrow apart from
+            # answers saved before the vault key was stored with them
+            stored = {"iterations": self.iterations, "token": encrypted_data.decode(),
+                      "escrowed": vault_key is not None}
+
             # Save encrypted answers
-            with open(self.questions_file, 'wb') as f:
-                f.write(encrypted_data)
-                
+            with open(self.questions_file, 'w') as f:
+                json.dump(stored, f)
+
             return True
         except Exception:
             return False
-            
-    def verify_answers(self, answers: list) -> bool:
-        """Verify if provided answers match stored answers"""
+
+    def _load_payload(self, answers: list) -> Optional[dict]:
+        """Decrypt the stored payload with the given answers, None if they are wrong"""
         try:
             if not os.path.exists(self.questions_file):
-                return False
-                
-            # Generate key from provided answers
-            key = self._generate_key(answers)
-            fernet = Fernet(key)
-            
+                return None
+
             # Read encrypted answers
             with open(self.questions_file, 'rb') as f:
                 encrypted_data = f.read()
-            
+            iterations = self.DEFAULT_ITERATIONS
+            if encrypted_data.startswith(b'{'):
+                stored = json.loads(encrypted_data)
+                iterations = stored["iterations"]
+                encrypted_data = stored["token"].encode()
+
+            # Generate key from provided answers, with the stored cost
+            key = self._generate_key(answers, iterations)
+            fernet = Fernet(key)
+
             # Try to decrypt - if successful, answers are correct
             decrypted = fernet.decrypt(encrypted_data)
-            stored_answers = json.loads(decrypted.decode())
-            
-            return stored_answers == answers
+            payload = json.loads(decrypted.decode())
+            if isinstance(payload, list):
+                # Stored before the vault key was escrowed
+                payload = {"answers": payload, "vault_key": None}
+
+            return payload if payload["answers"] == answers else None
         except Exception:
+            return None
+
+    def verify_answers(self, answers: list) -> bool:
+        """Verify if provided answers match stored answers"""
+        return self._load_payload(answers) is not None
+
+    def recover_vault_key(self, answers: list) -> Optional[bytes]:
+        """Return the escrowed vault key if the answers are correct"""
+        return self.check_answers(answers)[1]
+
+    def check_answers(self, answers: list) -> Tuple[bool, Optional[bytes]]:
+        """Verify answers and recover the escrowed vault key with one key derivation"""
+        payload = self._load_payload(answers)
+        if payload is None:
+            return False, None
+        vault_key = payload.get("vault_key")
+        return True, vault_key.encode() if vault_key else None
+
+    def needs_key_escrow(self) -> bool:
+        """Whether answers exist but the vault key is not stored with them"""
+        try:
+            with open(self.questions_file, 'rb') as f:
+                stored = f.read()
+        except OSError:
             return False
-            
+        if not stored.startswith(b'{'):
+            # Raw token written before answers carried the vault key
+            return True
+        try:
+            return not json.loads(stored).get("escrowed", False)
+        except ValueError:
+            return True
+
+    def escrow_vault_key(self, answers: list, vault_key: bytes) -> str:
+        """
+        Store vault_key with answers that were saved without it, once the
+        answers are verified. Returns "saved" or "incorrect_answers".
+        """
+        verified, _ = self.check_answers(answers)
+        if not verified:
+            return "incorrect_answers"
+        if not self.save_answers(answers, vault_key):
+            raise OSError(f"Could not write {self.questions_file}")
+        return "saved"
+
+    def _submit(self, func: Callable, callback: Optional[Callable[[Future], None]], *args) -> Future:
+        future = self._executor.submit(func, *args)
+        if callback is not None:
+            future.add_done_callback(callback)
+        return future
+
+    def save_answers_async(self, answers: list, vault_key: Optional[bytes] = None,
+                           callback: Optional[Callable[[Future], None]] = None) -> Future:
+        """save_answers on the worker thread; callback receives the finished future"""
+        return self._submit(self.save_answers, callback, answers, vault_key)
+
+    def verify_answers_async(self, answers: list,
+                             callback: Optional[Callable[[Future], None]] = None) -> Future:
+        """verify_answers on the worker thread; callback receives the finished future"""
+        return self._submit(self.verify_answers, callback, answers)
+
+    def check_answers_async(self, answers: list,
+                            callback: Optional[Callable[[Future], None]] = None) -> Future:
+        """check_answers on the worker thread; callback receives the finished future"""
+        return self._submit(self.check_answers, callback, answers)
+
+    def escrow_vault_key_async(self, answers: list, vault_key: bytes,
+                               callback: Optional[Callable[[Future], None]] = None) -> Future:
+        """escrow_vault_key on the worker thread; callback receives the finished future"""
+        return self._submit(self.escrow_vault_key, callback, answers, vault_key)
+
     def is_setup_needed(self) -> bool:
         """Check if security questions need to be set up"""
         return not os.path.exists(self.questions_file)
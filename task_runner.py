@@ -0,0 +1,161 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional
+
+
+class TaskCancelled(Exception):
+    """Raised inside a task at its next progress report after cancel()."""
+
+
+@dataclass
+class TaskOutcome:
+    name: str
+    result: Any = None
+    error: Optional[BaseException] = None
+    cancelled: bool = False
+    elapsed: float = 0.0
+
+
+class Task:
+    """Handle for a submitted task, also passed to the task itself when asked for."""
+
+    def __init__(self, runner: "TaskRunner", name: str, writes_vault: bool = False,
+                 reports: bool = False):
+        self.runner = runner
+        self.name = name
+        self.writes_vault = writes_vault
+        # Whether the task function gets this handle and can stop midway
+        self.reports = reports
+        self.future: Optional[Future] = None
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        """Drop the task if it is still queued, otherwise stop it at its next report()."""
+        self._cancel.set()
+        if self.future is not None:
+            self.future.cancel()
+
+    @property
+    def cancellable(self) -> bool:
+        """Whether Cancel may drop it: anything but a plain vault save."""
+        return self.reports or not self.writes_vault
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def report(self, message: str = "", fraction: Optional[float] = None):
+        """Post progress to the window. Raises TaskCancelled once cancelled."""
+        if self.cancelled:
+            raise TaskCancelled(self.name)
+        self.runner._post(TaskRunner.PROGRESS_EVENT, (self.name, message, fraction))
+
+
+class TaskRunner:
+    """
+    Runs blocking GUI actions (vault writes, browser automation, key
+    derivation) on a thread pool so the event loop never waits on them.
+
+    Completion is posted back with window.write_event_value as a
+    TaskOutcome under DONE_EVENT, progress as (name, message, fraction)
+    under PROGRESS_EVENT. Tasks that write the vault hold vault_lock, so
+    they run one at a time and in submission order relative to each other.
+    """
+
+    PROGRESS_EVENT = '-TASK-PROGRESS-'
+    DONE_EVENT = '-TASK-DONE-'
+
+    def __init__(self, window=None, workers: int = 4):
+        self.window = window
+        self.vault_lock = threading.RLock()
+        self.tasks: List[Task] = []
+        self.lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="task")
+        # Vault writes are queued here so they keep their order
+        self._vault_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="vault")
+
+    def submit(self, name: str, func: Callable, *args, writes_vault: bool = False,
+               pass_task: bool = False) -> Task:
+        """
+        Run func(*args) in the background. With pass_task the Task is also
+        passed as the task keyword so func can report progress and notice
+        cancellation.
+        """
+        task = Task(self, name, writes_vault, pass_task)
+        executor = self._vault_executor if writes_vault else self._executor
+        with self.lock:
+            self.tasks.append(task)
+            task.future = executor.submit(self._run, task, func, args)
+        task.future.add_done_callback(lambda future: self._finish(task, future))
+        return task
+
+    def _run(self, task: Task, func: Callable, args: tuple) -> TaskOutcome:
+        outcome = TaskOutcome(task.name)
+        start = time.perf_counter()
+        kwargs = {"task": task} if task.reports else {}
+        try:
+            if task.cancelled:
+                raise TaskCancelled(task.name)
+            if task.writes_vault:
+                with self.vault_lock:
+                    outcome.result = func(*args, **kwargs)
+            else:
+                outcome.result = func(*args, **kwargs)
+        except TaskCancelled:
+            outcome.cancelled = True
+        except Exception as e:
+            outcome.error = e
+        outcome.elapsed = time.perf_counter() - start
+        return outcome
+
+    def _finish(self, task: Task, future: Future):
+        with self.lock:
+            if task in self.tasks:
+                self.tasks.remove(task)
+        outcome = TaskOutcome(task.name, cancelled=True) if future.cancelled() else future.result()
+        self._post(self.DONE_EVENT, outcome)
+
+    def _post(self, event: str, value):
+        if self.window is not None:
+            self.window.write_event_value(event, value)
+
+    def busy(self) -> bool:
+        with self.lock:
+            return bool(self.tasks)
+
+    def cancel(self, name: str):
+        """Cancel every queued or running task with this name."""
+        with self.lock:
+            tasks = [task for task in self.tasks if task.name == name]
+        for task in tasks:
+            task.cancel()
+
+    def cancel_all(self):
+        with self.lock:
+            tasks = list(self.tasks)
+        for task in tasks:
+            task.cancel()
+
+    def cancel_cancellable(self):
+        """Cancel every task but plain vault saves, so queued edits are never lost."""
+        with self.lock:
+            tasks = [task for task in self.tasks if task.cancellable]
+        for task in tasks:
+            task.cancel()
+
+    def shutdown(self, wait: bool = True):
+        """
+        Drop queued background work and cancel cancellable tasks, but let
+        plain vault saves that are already queued complete. With wait,
+        block until they have.
+
+        Browser tasks that are already running cannot be interrupted and
+        are not waited for; they finish on their own in the background.
+        """
+        # The window may be closing; nothing is posted to it from here on
+        self.window = None
+        self.cancel_cancellable()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._vault_executor.shutdown(wait=wait)
@@ -0,0 +1,102 @@
+import pytest
+
+pytest.importorskip("selenium")
+pytest.importorskip("webdriver_manager")
+
+from selenium.webdriver.support.ui import WebDriverWait
+
+from conftest import chrome_installed
+from driver_pool import DriverPool
+
+needs_chrome = pytest.mark.skipif(not chrome_installed(), reason="Chrome is not installed")
+
+
+@pytest.fixture
+def pool():
+    # Not warmed, so the second session reuses the first browser
+    pool = DriverPool(size=1, warm=False)
+    try:
+        pool.release(pool.acquire(timeout=60))
+    except Exception as e:
+        pool.close()
+        pytest.skip(f"Could not start Chrome: {e}")
+    yield pool
+    pool.close()
+
+
+def test_nothing_starts_before_first_use():
+    pool = DriverPool(size=2)
+    assert pool.created == 0
+    pool.close()
+    assert pool.created == 0
+
+
+def test_shared_pool_is_replaced_once_closed():
+    previous = DriverPool._shared
+    try:
+        DriverPool._shared = None
+        shared = DriverPool.shared()
+        assert DriverPool.shared() is shared
+        shared.close()
+        assert DriverPool.shared() is not shared
+    finally:
+        DriverPool._shared.close()
+        DriverPool._shared = previous
+
+
+def test_closed_pool_refuses_sessions():
+    pool = DriverPool(size=1)
+    pool.close()
+    with pytest.raises(RuntimeError):
+        pool.acquire(timeout=0)
+
+
+@needs_chrome
+def test_sessions_do_not_share_state(pool, fixture_server):
+    url = f"{fixture_server}/blank.html"
+    with pool.session() as driver:
+        driver.get(url)
+        driver.execute_script(
+            "localStorage.setItem('k', 'v'); sessionStorage.setItem('k', 'v');"
+            "document.cookie = 'k=v; path=/';")
+    with pool.session() as driver:
+        driver.get(url)
+        state = driver.execute_script(
+            "return [localStorage.getItem('k'), sessionStorage.getItem('k'), document.cookie];")
+    assert state == [None, None, ""]
+    assert pool.created == 1
+    assert pool.reused >= 1
+
+
+@needs_chrome
+def test_sessions_do_not_share_state_across_redirects(pool, fixture_server):
+    with pool.session() as driver:
+        driver.get(f"{fixture_server}/redirect.html")
+        WebDriverWait(driver, 10).until(lambda d: "localhost" in d.current_url)
+        driver.execute_script("localStorage.setItem('k', 'v'); sessionStorage.setItem('k', 'v');")
+    with pool.session() as driver:
+        for url in (f"{fixture_server}/blank.html", f"{fixture_server.replace('127.0.0.1', 'localhost')}/blank.html"):
+            driver.get(url)
+            state = driver.execute_script("return [localStorage.getItem('k'), sessionStorage.getItem('k')];")
+            assert state == [None, None], url
+    assert pool.created == 1
+
+
+@needs_chrome
+def test_broken_session_is_replaced(pool, fixture_server):
+    with pool.session() as driver:
+        driver.quit()
+    with pool.session() as driver:
+        driver.get(f"{fixture_server}/blank.html")
+        assert driver.title == "Blank"
+    assert pool.created == 2
+
+
+@needs_chrome
+def test_close_quits_checked_out_sessions(pool):
+    driver = pool.acquire(timeout=60)
+    pool.close()
+    assert not pool.is_healthy(driver)
+    pool.release(driver)
+    with pytest.raises(RuntimeError):
+        pool.acquire(timeout=0)
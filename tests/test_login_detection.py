@@ -0,0 +1,64 @@
+import pytest
+
+from login_detection import matches_role
+
+pytest.importorskip("selenium")
+pytest.importorskip("webdriver_manager")
+
+from locator_cache import LocatorCache
+from web_integration import WebAutomation
+
+SITE = {"username_field": {"id": "user"}, "password_field": {"id": "pass"}, "submit_button": {"id": "go"}}
+
+
+def candidate(tag, type_="", role="", visible=True):
+    return {"locator": {}, "element": object(), "visible": visible, "tag": tag, "type": type_, "role": role}
+
+
+class ResolvingDriver:
+    """Answers the locator resolution script with fixed candidates."""
+
+    def __init__(self, candidates):
+        self.candidates = candidates
+
+    def execute_script(self, script, *args):
+        return self.candidates
+
+
+@pytest.mark.parametrize("role, found, expected", [
+    ("password_field", candidate("input", "password"), True),
+    ("password_field", candidate("input", "text"), False),
+    ("username_field", candidate("input", "email"), True),
+    ("username_field", candidate("input"), True),
+    ("username_field", candidate("input", "password"), False),
+    ("username_field", candidate("textarea"), False),
+    ("submit_button", candidate("button", "submit"), True),
+    ("submit_button", candidate("input", "submit"), True),
+    ("submit_button", candidate("div", role="button"), True),
+    ("submit_button", candidate("input", "text"), False),
+])
+def test_matches_role(role, found, expected):
+    assert matches_role(found, role) is expected
+
+
+@pytest.fixture
+def web_auto(tmp_path):
+    cache = LocatorCache(str(tmp_path / "known_sites.json"))
+    cache.store("example.com", dict(SITE))
+    return WebAutomation(locator_cache=cache)
+
+
+def test_cached_locators_of_the_right_kind_are_used(web_auto):
+    driver = ResolvingDriver([candidate("input", "text"), candidate("input", "password"),
+                              candidate("button", "submit")])
+    candidates, hit = web_auto._cached_fields(driver, "example.com")
+    assert hit
+    assert web_auto.locator_cache.get("example.com")
+
+
+def test_stale_locator_on_another_input_is_invalidated(web_auto):
+    # The stored password locator now matches a visible text box
+    driver = ResolvingDriver([candidate("input", "email"), candidate("input", "text"), None])
+    candidates, hit = web_auto._cached_fields(driver, "example.com")
+    assert not hit
+    assert web_auto.locator_cache.get("example.com") is None
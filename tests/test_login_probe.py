@@ -0,0 +1,36 @@
+from login_probe import LOGIN_FORM, NEEDS_BROWSER, NO_FORM, LoginFormProbe
+
+
+def test_static_login_form(fixture_server):
+    result = LoginFormProbe().probe(f"{fixture_server}/login.html")
+    assert result.status == LOGIN_FORM
+    assert result.locators == {
+        "username_field": {"id": "username"},
+        "password_field": {"id": "password"},
+        "submit_button": {"id": "sign-in"},
+    }
+
+
+def test_content_page_with_scripts_has_no_form(fixture_server):
+    assert LoginFormProbe().probe(f"{fixture_server}/article.html").status == NO_FORM
+
+
+def test_client_rendered_page_needs_browser(fixture_server):
+    assert LoginFormProbe().probe(f"{fixture_server}/app.html").status == NEEDS_BROWSER
+
+
+def test_missing_page_has_no_form(fixture_server):
+    assert LoginFormProbe().probe(f"{fixture_server}/missing.html").status == NO_FORM
+
+
+def test_unreachable_page_needs_browser():
+    assert LoginFormProbe(timeout=1).probe("http://127.0.0.1:9/login").status == NEEDS_BROWSER
+
+
+def test_template_inputs_are_ignored(fixture_server):
+    result = LoginFormProbe().probe(f"{fixture_server}/template_login.html")
+    assert result.status == LOGIN_FORM
+    assert result.locators["username_field"] == {"css": 'input[autocomplete="username"]'}
+    assert result.locators["password_field"] == {"name": "pw"}
+    # Neither id, name nor an identifying attribute: not stored at all
+    assert "submit_button" not in result.locators
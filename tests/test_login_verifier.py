@@ -0,0 +1,67 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("selenium")
+pytest.importorskip("webdriver_manager")
+
+from driver_pool import DriverPool
+from locator_cache import LocatorCache
+from login_probe import LoginFormProbe
+from login_verifier import BulkLoginVerifier
+from password_manager_core import PasswordEntry
+from web_integration import FormResult, WebAutomation
+
+
+class SlowAutomation:
+    """Stands in for WebAutomation with checks that take seconds each."""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.pool = SimpleNamespace(size=2)
+
+    def test_login_form(self, url: str) -> FormResult:
+        time.sleep(self.seconds)
+        return FormResult(True, "Login form found", {"total": self.seconds})
+
+
+def entries(urls):
+    return [(f"site-{i}", PasswordEntry("someone", "secret", url=url)) for i, url in enumerate(urls)]
+
+
+def test_queued_checks_time_out_after_they_start():
+    verifier = BulkLoginVerifier(SlowAutomation(1.0), workers=2, site_timeout=0.3)
+    start = time.perf_counter()
+    arrivals = {}
+    for result in verifier.verify(entries(["http://a", "http://b", "http://c"])):
+        arrivals[result.url] = (time.perf_counter() - start, result.timed_out)
+    # a and b start at once; c only starts when a worker frees up at ~1.0s
+    assert all(timed_out for _, timed_out in arrivals.values())
+    assert arrivals["http://a"][0] < 0.6
+    assert arrivals["http://c"][0] < 1.7
+
+
+def test_entries_without_url_are_skipped():
+    verifier = BulkLoginVerifier(SlowAutomation(0), workers=2)
+    report = verifier.verify_all(entries(["http://a", ""]))
+    assert report.total == 1
+
+
+def test_fixture_pages(fixture_server, tmp_path):
+    # Static pages are settled by the HTTP probe, so no browser is started
+    pool = DriverPool(size=1, warm=False)
+    web_auto = WebAutomation(pool, locator_cache=LocatorCache(str(tmp_path / "known_sites.json")),
+                             probe=LoginFormProbe(timeout=5))
+    verifier = BulkLoginVerifier(web_auto, workers=4, site_timeout=10)
+    results = []
+    report = verifier.verify_all(
+        entries([f"{fixture_server}/login.html", f"{fixture_server}/blank.html",
+                 f"{fixture_server}/missing.html"] * 3),
+        callback=results.append)
+    pool.close()
+
+    assert (report.total, report.found, report.missing, report.timed_out) == (9, 3, 6, 0)
+    assert report.rate > 0
+    assert {result.url for result in results if result.found} == {f"{fixture_server}/login.html"}
+    assert pool.created == 0
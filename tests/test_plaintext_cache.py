@@ -0,0 +1,56 @@
+import threading
+import time
+
+from password_manager_core import PlaintextCache
+
+
+def test_expired_entries_are_dropped_on_any_access():
+    cache = PlaintextCache(ttl=0.05)
+    cache.put("a", "secret-a")
+    time.sleep(0.1)
+    cache.put("b", "secret-b")
+    assert "a" not in cache._items
+    assert cache.get("b") == "secret-b"
+
+
+def test_put_again_renews_expiry():
+    cache = PlaintextCache(ttl=0.1)
+    cache.put("a", "old")
+    time.sleep(0.06)
+    cache.put("a", "new")
+    time.sleep(0.06)
+    assert cache.get("a") == "new"
+
+
+def test_least_recently_used_is_evicted():
+    cache = PlaintextCache(max_size=2)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    cache.get("a")
+    cache.put("c", "3")
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+
+
+def test_concurrent_get_and_invalidate():
+    cache = PlaintextCache(max_size=16)
+    errors = []
+
+    def reader():
+        try:
+            for i in range(20000):
+                cache.get(f"s{i % 8}")
+        except Exception as e:
+            errors.append(e)
+
+    def writer():
+        for i in range(20000):
+            cache.put(f"s{i % 8}", "x")
+            cache.invalidate(f"s{(i + 3) % 8}")
+
+    threads = [threading.Thread(target=reader), threading.Thread(target=writer)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
@@ -0,0 +1,59 @@
+import base64
+import json
+import os
+
+import pytest
+from cryptography.fernet import Fernet
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+
+from password_manager_core import PasswordManager
+from security_questions import SecurityQuestions
+
+ANSWERS = ["rex", "helsinki", "blue"]
+MASTER = "Master#Pass1"
+
+
+@pytest.fixture
+def legacy_vault(tmp_path, monkeypatch):
+    """A vault from before key wrapping: raw key.key, answers as a plain list."""
+    monkeypatch.chdir(tmp_path)
+    key = Fernet.generate_key()
+    (tmp_path / "key.key").write_bytes(key)
+    salt = os.urandom(16)
+    (tmp_path / "security_salt.bin").write_bytes(salt)
+    kdf = PBKDF2HMAC(algorithm=hashes.SHA256(), length=32, salt=salt, iterations=100000)
+    answers_key = base64.urlsafe_b64encode(kdf.derive("".join(ANSWERS).encode()))
+    (tmp_path / "security_answers.bin").write_bytes(Fernet(answers_key).encrypt(json.dumps(ANSWERS).encode()))
+    return key
+
+
+def test_legacy_answers_need_escrow_after_upgrade(legacy_vault):
+    manager = PasswordManager(unlock_seconds=0.05)
+    assert manager.initialize(MASTER)
+    assert manager.master_key.is_wrapped()
+    assert SecurityQuestions().needs_key_escrow()
+    manager.close()
+
+
+def test_escrowed_key_allows_reset(legacy_vault):
+    manager = PasswordManager(unlock_seconds=0.05)
+    assert manager.initialize(MASTER)
+    security = SecurityQuestions()
+    assert security.escrow_vault_key(["x", "y", "z"], manager.vault_key) == "incorrect_answers"
+    assert security.escrow_vault_key(ANSWERS, manager.vault_key) == "saved"
+    assert not security.needs_key_escrow()
+    manager.close()
+
+    verified, vault_key = SecurityQuestions().check_answers(ANSWERS)
+    assert verified and vault_key == legacy_vault
+    assert PasswordManager(unlock_seconds=0.05).reset_master_password("New#Pass12", vault_key)
+    assert PasswordManager(unlock_seconds=0.05).initialize("New#Pass12")
+
+
+def test_answers_saved_with_key_need_no_escrow(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    security = SecurityQuestions()
+    assert not security.needs_key_escrow()
+    assert security.save_answers(ANSWERS, Fernet.generate_key())
+    assert not security.needs_key_escrow()
@@ -0,0 +1,28 @@
+import threading
+
+from task_runner import TaskRunner
+
+
+def test_cancel_keeps_queued_saves():
+    # One worker, so the second autofill is still queued when cancelled
+    runner = TaskRunner(workers=1)
+    release = threading.Event()
+    log = []
+    runner.submit("busy", release.wait, writes_vault=True)
+    runner.submit("save", log.append, "saved", writes_vault=True)
+    runner.submit("import", lambda task: log.append("imported"), writes_vault=True, pass_task=True)
+    runner.submit("autofill", release.wait)
+    runner.submit("autofill", log.append, "filled")
+    runner.cancel_cancellable()
+    release.set()
+    runner.shutdown()
+    assert log == ["saved"]
+
+
+def test_vault_writes_keep_their_order():
+    runner = TaskRunner()
+    log = []
+    for i in range(20):
+        runner.submit("save", log.append, i, writes_vault=True)
+    runner.shutdown()
+    assert log == list(range(20))
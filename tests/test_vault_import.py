@@ -0,0 +1,46 @@
+import json
+
+import pytest
+from cryptography.fernet import Fernet
+
+from password_manager_core import PasswordManager
+from vault_import import VaultImporter
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    manager = PasswordManager()
+    manager.fernet = Fernet(Fernet.generate_key())
+    manager._load_passwords()
+    yield manager
+    manager.close()
+
+
+def test_repeated_service_is_imported_once(manager):
+    rows = [
+        {"name": "mail", "username": "first", "password": "one"},
+        {"name": "bank", "username": "me", "password": "two"},
+        {"name": "mail", "username": "second", "password": "three"},
+    ]
+    status = VaultImporter(manager, chunk_size=2).import_rows(iter(rows))
+    assert (status.imported, status.skipped, status.duplicates) == (2, 1, 1)
+    assert manager.get_password_entry("mail").username == "first"
+
+
+def test_bitwarden_export(manager, tmp_path):
+    path = tmp_path / "export.json"
+    path.write_text(json.dumps({"encrypted": False, "items": [
+        {"name": "mail", "login": {"username": "me", "password": "pw",
+                                   "uris": [{"uri": "https://mail.example"}]}},
+    ]}, indent=2))
+    status = VaultImporter(manager).import_file(str(path))
+    assert status.imported == 1
+    assert manager.get_password_entry("mail").url == "https://mail.example"
+
+
+def test_unknown_json_object_is_rejected(manager, tmp_path):
+    path = tmp_path / "export.json"
+    path.write_text(json.dumps({"accounts": [{"name": "mail", "password": "pw"}]}, indent=2))
+    with pytest.raises(ValueError, match="Unsupported"):
+        VaultImporter(manager).import_file(str(path))
@@ -0,0 +1,40 @@
+import os
+
+from vault_storage import JournaledVaultStorage
+
+
+def record(name):
+    return {"username": name, "password": "token", "url": "", "category": "General"}
+
+
+def test_torn_journal_line_is_dropped(tmp_path):
+    storage = JournaledVaultStorage(str(tmp_path / "passwords.json"))
+    storage.load()
+    storage.put("a", record("a"))
+    storage.put("b", record("b"))
+    storage.close()
+    with open(storage.journal_file, "r+b") as f:
+        f.truncate(os.path.getsize(storage.journal_file) - 10)
+
+    storage = JournaledVaultStorage(str(tmp_path / "passwords.json"))
+    assert list(storage.load()) == ["a"]
+
+
+def test_op_missing_only_its_newline_survives_later_appends(tmp_path):
+    path = str(tmp_path / "passwords.json")
+    storage = JournaledVaultStorage(path)
+    storage.load()
+    storage.put("a", record("a"))
+    storage.put("b", record("b"))
+    storage.close()
+    with open(storage.journal_file, "r+b") as f:
+        f.truncate(os.path.getsize(storage.journal_file) - 1)
+
+    storage = JournaledVaultStorage(path)
+    assert list(storage.load()) == ["a", "b"]
+    storage.put("c", record("c"))
+    storage.close()
+
+    storage = JournaledVaultStorage(path)
+    assert list(storage.load()) == ["a", "b", "c"]
+    storage.close()
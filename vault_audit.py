@@ -0,0 +1,86 @@
+import hashlib
+import hmac
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from password_manager_core import PasswordManager
+from breach_check import BreachedPasswordChecker
+
+
+@dataclass
+class AuditReport:
+    weak: List[Tuple[str, int]] = field(default_factory=list)
+    reused: List[List[str]] = field(default_factory=list)
+    stale: List[str] = field(default_factory=list)
+    breached: List[str] = field(default_factory=list)
+    total: int = 0
+    rescored: int = 0
+    elapsed: float = 0.0
+
+
+class VaultAuditor:
+    """
+    Vault-wide security audit: weak, reused, stale and (given a local
+    breach index) breached passwords.
+
+    Results are cached per service alongside the ciphertext they were
+    computed from. Since a password change always produces a new token, a
+    later audit only decrypts and scores entries whose token changed.
+    """
+
+    def __init__(self, manager: PasswordManager, weak_score: int = 50, max_age_days: float = 365,
+                 breach_checker: Optional[BreachedPasswordChecker] = None):
+        self.manager = manager
+        self.weak_score = weak_score
+        self.max_age_days = max_age_days
+        self.breach_checker = breach_checker
+        # service -> (ciphertext, password digest, strength score, breached)
+        self._cache: Dict[str, Tuple[str, bytes, int, bool]] = {}
+        # Keyed digests, so the cache never holds plain password hashes
+        self._digest_key = os.urandom(32)
+
+    def _digest(self, password: str) -> bytes:
+        return hmac.new(self._digest_key, password.encode(), hashlib.sha256).digest()
+
+    def audit(self) -> AuditReport:
+        start = time.perf_counter()
+        report = AuditReport()
+        stale_before = time.time() - self.max_age_days * 86400
+        cache = {}
+        changed = []
+
+        for service, record in self.manager.iter_records():
+            report.total += 1
+            cached = self._cache.get(service)
+            if cached is not None and cached[0] == record["password"]:
+                cache[service] = cached
+            else:
+                changed.append((service, record["password"]))
+            if record.get("last_modified", 0) < stale_before:
+                report.stale.append(service)
+
+        # Only new or changed entries are decrypted and scored, in one batch.
+        # The tokens just read are decrypted directly, so the scores match
+        # them and the plaintexts stay out of the manager's cache.
+        passwords = [self.manager.decrypt_password(token) for _, token in changed]
+        scores = self.manager.strength_checker.check_strength_many(passwords)
+        if self.breach_checker is not None and self.breach_checker.available():
+            breached = self.breach_checker.check_many(passwords)
+        else:
+            breached = [False] * len(passwords)
+        for (service, token), password, result, is_breached in zip(changed, passwords, scores, breached):
+            cache[service] = (token, self._digest(password), result[0], is_breached)
+        report.rescored = len(changed)
+        self._cache = cache
+
+        groups: Dict[bytes, List[str]] = {}
+        for service, (_, digest, score, is_breached) in cache.items():
+            groups.setdefault(digest, []).append(service)
+            if score < self.weak_score:
+                report.weak.append((service, score))
+            if is_breached:
+                report.breached.append(service)
+        report.reused = [services for services in groups.values() if len(services) > 1]
+        report.elapsed = time.perf_counter() - start
+        return report
@@ -0,0 +1,75 @@
+import json
+import os
+import struct
+from itertools import islice
+from typing import Iterator, List, Tuple
+from password_manager_core import PasswordManager
+
+
+class VaultBackup:
+    """
+    Streaming encrypted backup and restore.
+
+    A backup is a magic header followed by length-prefixed Fernet tokens,
+    each holding a chunk of encrypted vault records, and a zero-length
+    terminator. Records are pulled from the storage layer through a
+    generator and written chunk by chunk, so memory use does not depend on
+    vault size in either direction.
+    """
+
+    MAGIC = b"PMBACKUP1\n"
+    LENGTH = struct.Struct(">I")
+
+    def __init__(self, manager: PasswordManager, chunk_size: int = 500):
+        self.manager = manager
+        self.chunk_size = chunk_size
+
+    def export(self, path: str) -> int:
+        """Write a backup of the vault to path, returning the entry count."""
+        count = 0
+        tmp_path = path + ".tmp"
+        records = self.manager.iter_records()
+        with open(tmp_path, "wb") as f:
+            f.write(self.MAGIC)
+            while True:
+                chunk = list(islice(records, self.chunk_size))
+                if not chunk:
+                    break
+                token = self.manager.fernet.encrypt(json.dumps(chunk).encode())
+                f.write(self.LENGTH.pack(len(token)))
+                f.write(token)
+                count += len(chunk)
+            f.write(self.LENGTH.pack(0))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        return count
+
+    def _iter_chunks(self, path: str) -> Iterator[List[Tuple[str, dict]]]:
+        with open(path, "rb") as f:
+            if f.read(len(self.MAGIC)) != self.MAGIC:
+                raise ValueError(f"Not a vault backup: {path}")
+            while True:
+                header = f.read(self.LENGTH.size)
+                if len(header) < self.LENGTH.size:
+                    raise ValueError(f"Backup is truncated: {path}")
+                (length,) = self.LENGTH.unpack(header)
+                if length == 0:
+                    return
+                token = f.read(length)
+                if len(token) < length:
+                    raise ValueError(f"Backup is truncated: {path}")
+                yield json.loads(self.manager.fernet.decrypt(token))
+
+    def restore(self, path: str, overwrite: bool = False) -> int:
+        """
+        Restore entries from a backup, chunk by chunk, returning the number
+        restored. Existing services are kept unless overwrite is set. A
+        truncated backup raises ValueError after restoring the intact chunks.
+        """
+        count = 0
+        for chunk in self._iter_chunks(path):
+            if not overwrite:
+                chunk = [item for item in chunk if item[0] not in self.manager.password_dict]
+            count += self.manager.add_records(chunk)
+        return count
@@ -0,0 +1,189 @@
+import csv
+import json
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from password_manager_core import PasswordManager, PasswordEntry
+
+# Column names used by common password manager and browser exports
+FIELD_ALIASES = {
+    "service": ["name", "title", "service", "account"],
+    "username": ["username", "login_username", "login name", "login", "user", "email"],
+    "password": ["password", "login_password"],
+    "url": ["url", "login_uri", "web site", "website", "origin_url", "uri"],
+    "category": ["category", "grouping", "folder", "group"],
+}
+
+# Start of the entry list in a Bitwarden-style export object
+_ITEMS_ARRAY = re.compile(r'"items"\s*:\s*\[')
+
+
+@dataclass
+class ImportProgress:
+    imported: int = 0
+    # Includes the duplicates
+    skipped: int = 0
+    # Rows repeating a service seen earlier in the same import
+    duplicates: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def rate(self) -> float:
+        """Imported entries per second."""
+        return self.imported / self.elapsed if self.elapsed else 0.0
+
+
+class VaultImporter:
+    """
+    Streaming importer for CSV and JSON exports from other password managers.
+
+    Rows are read one at a time and committed in chunks of chunk_size, with
+    each chunk's passwords encrypted in parallel on a thread pool. Only one
+    chunk is held in memory at a time, whatever the size of the file.
+    A service that appears more than once is imported from its first row;
+    later rows for it are skipped and counted as duplicates.
+    """
+
+    def __init__(self, manager: PasswordManager, chunk_size: int = 500, workers: Optional[int] = None,
+                 overwrite: bool = False, progress: Optional[Callable[[ImportProgress], None]] = None):
+        self.manager = manager
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.overwrite = overwrite
+        self.progress = progress
+
+    def import_file(self, path: str) -> ImportProgress:
+        """Import every usable row of an export file."""
+        if path.lower().endswith(".csv"):
+            rows = self._iter_csv(path)
+        else:
+            rows = self._iter_json(path)
+        return self.import_rows(rows)
+
+    def import_rows(self, rows: Iterator[Dict[str, str]]) -> ImportProgress:
+        """Import rows (dicts keyed by export column names)."""
+        status = ImportProgress()
+        start = time.perf_counter()
+        chunk: List[Tuple[str, PasswordEntry]] = []
+        # Services imported so far, so repeated rows aren't counted twice
+        seen = set()
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for row in rows:
+                item = self._row_to_entry(row)
+                if item is not None and item[0] in seen:
+                    status.duplicates += 1
+                    item = None
+                if item is None or (not self.overwrite and item[0] in self.manager.password_dict):
+                    status.skipped += 1
+                    continue
+                seen.add(item[0])
+                chunk.append(item)
+                if len(chunk) >= self.chunk_size:
+                    status.imported += self.manager.add_entries(chunk, executor)
+                    chunk = []
+                    self._report(status, start)
+            if chunk:
+                status.imported += self.manager.add_entries(chunk, executor)
+        self._report(status, start)
+        return status
+
+    def _report(self, status: ImportProgress, start: float):
+        status.elapsed = time.perf_counter() - start
+        if self.progress:
+            self.progress(status)
+
+    @staticmethod
+    def _pick(row: Dict[str, str], field: str) -> str:
+        for alias in FIELD_ALIASES[field]:
+            value = row.get(alias)
+            if value:
+                return str(value).strip()
+        return ""
+
+    def _row_to_entry(self, row: Dict[str, str]) -> Optional[Tuple[str, PasswordEntry]]:
+        row = {str(key).strip().lower(): value for key, value in row.items() if key is not None}
+        # Bitwarden JSON nests the credentials under "login"
+        if isinstance(row.get("login"), dict):
+            login = row.pop("login")
+            row.setdefault("username", login.get("username"))
+            row.setdefault("password", login.get("password"))
+            uris = login.get("uris") or []
+            if uris:
+                row.setdefault("url", uris[0].get("uri"))
+
+        password = self._pick(row, "password")
+        url = self._pick(row, "url")
+        service = self._pick(row, "service") or self._service_from_url(url)
+        if not password or not service:
+            return None
+        now = time.time()
+        return service, PasswordEntry(
+            username=self._pick(row, "username"),
+            password=password,
+            url=url,
+            category=sys.intern(self._pick(row, "category") or "General"),
+            created_date=now,
+            last_modified=now
+        )
+
+    @staticmethod
+    def _service_from_url(url: str) -> str:
+        """Fallback service name for rows without one."""
+        url = url.split("://", 1)[-1]
+        return url.split("/", 1)[0]
+
+    @staticmethod
+    def _iter_csv(path: str) -> Iterator[Dict[str, str]]:
+        with open(path, "r", newline="", encoding="utf-8-sig") as f:
+            yield from csv.DictReader(f)
+
+    @staticmethod
+    def _iter_json(path: str, chunk_size: int = 65536) -> Iterator[Dict]:
+        """
+        Yield objects from a JSON array (optionally under an "items" key, as
+        in Bitwarden exports) or from JSON Lines, without loading the file.
+        """
+        decoder = json.JSONDecoder()
+        with open(path, "r", encoding="utf-8-sig") as f:
+            buffer = f.read(chunk_size).lstrip()
+            if buffer.startswith("{"):
+                try:
+                    first = json.loads(buffer.split("\n", 1)[0])
+                except ValueError:
+                    first = None
+                if first is None or isinstance(first.get("items"), list):
+                    # A single export object: skip ahead to its items array
+                    items = _ITEMS_ARRAY.search(buffer)
+                    while items is None:
+                        more = f.read(chunk_size)
+                        if not more:
+                            raise ValueError(f"Unsupported JSON export, no \"items\" array: {path}")
+                        buffer += more
+                        items = _ITEMS_ARRAY.search(buffer)
+                    buffer = buffer[items.end():]
+            elif buffer.startswith("["):
+                buffer = buffer[1:]
+
+            while True:
+                buffer = buffer.lstrip(" \t\r\n,")
+                if not buffer:
+                    buffer = f.read(chunk_size)
+                    if not buffer:
+                        return
+                    continue
+                if buffer.startswith("]"):
+                    return
+                try:
+                    obj, end = decoder.raw_decode(buffer)
+                except ValueError:
+                    more = f.read(chunk_size)
+                    if not more:
+                        raise ValueError(f"Malformed JSON export: {path}")
+                    buffer += more
+                    continue
+                if isinstance(obj, dict):
+                    yield obj
+                buffer = buffer[end:]
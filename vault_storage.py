@@ -0,0 +1,422 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+class JournaledVaultStorage:
+    """
+    Vault storage made of a JSON snapshot plus an append-only journal.
+
+    Every mutation is appended to the journal as a single line, so a write
+    costs the same no matter how many entries the vault holds. Once the
+    journal grows past compact_threshold operations it is folded into a new
+    snapshot on a background thread.
+    """
+
+    def __init__(self, snapshot_file: str = "passwords.json", compact_threshold: int = 1000):
+        self.snapshot_file = snapshot_file
+        self.journal_file = snapshot_file + ".journal"
+        self.compacting_file = self.journal_file + ".compacting"
+        self.compact_threshold = compact_threshold
+        self.records: Dict[str, Dict] = {}
+        self.lock = threading.Lock()
+        self._journal = None
+        self._journal_ops = 0
+        self._compactor: Optional[threading.Thread] = None
+
+    def load(self) -> Dict[str, Dict]:
+        """Load the snapshot and replay any journaled mutations on top of it."""
+        with self.lock:
+            records = {}
+            if os.path.exists(self.snapshot_file):
+                with open(self.snapshot_file, "r") as f:
+                    records = json.load(f)
+
+            leftover = os.path.exists(self.compacting_file)
+            if leftover:
+                self._replay(self.compacting_file, records)
+            self._journal_ops = self._replay(self.journal_file, records)
+            self.records = records
+
+            # A compaction was interrupted: finish it now so the journals
+            # can be discarded before new mutations are appended.
+            if leftover:
+                self._write_snapshot(records)
+                os.remove(self.compacting_file)
+                if os.path.exists(self.journal_file):
+                    os.remove(self.journal_file)
+                self._journal_ops = 0
+            return records
+
+    def get(self, service: str) -> Optional[Dict]:
+        """Return the encrypted record for a service, if any."""
+        return self.records.get(service)
+
+    def iter_records(self) -> Iterator[Tuple[str, Dict]]:
+        """Yield (service, record) pairs from a point-in-time view of the vault."""
+        with self.lock:
+            records = dict(self.records)
+        yield from records.items()
+
+    def _replay(self, path: str, records: Dict[str, Dict]) -> int:
+        """Apply journal operations from path to records, returning the op count."""
+        if not os.path.exists(path):
+            return 0
+        applied = 0
+        good_offset = 0
+        unterminated = False
+        with open(path, "rb") as f:
+            for line in f:
+                try:
+                    op = json.loads(line)
+                except ValueError:
+                    # Torn write from a crash: everything after it is unusable
+                    break
+                # A batch is one line, so it is replayed entirely or not at all
+                ops = op["ops"] if op["op"] == "batch" else [op]
+                for op in ops:
+                    if op["op"] == "put":
+                        records[op["service"]] = op["record"]
+                    elif op["op"] == "delete":
+                        records.pop(op["service"], None)
+                applied += len(ops)
+                good_offset += len(line)
+                # Complete op whose newline was lost in a crash
+                unterminated = not line.endswith(b"\n")
+        if good_offset < os.path.getsize(path):
+            with open(path, "r+b") as f:
+                f.truncate(good_offset)
+        elif unterminated:
+            # Terminate it, or the next append would run onto the same line
+            with open(path, "ab") as f:
+                f.write(b"\n")
+                f.flush()
+                os.fsync(f.fileno())
+        return applied
+
+    def _append(self, op: Dict, count: int = 1):
+        """Durably append one operation to the journal."""
+        if self._journal is None:
+            self._journal = open(self.journal_file, "a", encoding="utf-8")
+        self._journal.write(json.dumps(op) + "\n")
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+        self._journal_ops += count
+
+    def put(self, service: str, record: Dict):
+        """Store the encrypted record for a service."""
+        with self.lock:
+            self._append({"op": "put", "service": service, "record": record})
+            self.records[service] = record
+        self._maybe_compact()
+
+    def delete(self, service: str):
+        """Remove a service from the vault."""
+        with self.lock:
+            self._append({"op": "delete", "service": service})
+            self.records.pop(service, None)
+        self._maybe_compact()
+
+    def apply(self, puts: Dict[str, Dict], deletes: Iterable[str]):
+        """Apply many puts and deletes as one atomic journal record."""
+        ops = [{"op": "delete", "service": service} for service in deletes]
+        ops += [{"op": "put", "service": service, "record": record} for service, record in puts.items()]
+        if not ops:
+            return
+        with self.lock:
+            self._append({"op": "batch", "ops": ops}, len(ops))
+            for op in ops:
+                if op["op"] == "put":
+                    self.records[op["service"]] = op["record"]
+                else:
+                    self.records.pop(op["service"], None)
+        self._maybe_compact()
+
+    def _maybe_compact(self):
+        if self._journal_ops >= self.compact_threshold:
+            self.compact()
+
+    def compact(self, wait: bool = False):
+        """
+        Fold the journal into a fresh snapshot.
+
+        The active journal is rotated aside under the lock so new mutations
+        keep appending while the snapshot is written in the background.
+        """
+        with self.lock:
+            if self._compactor is not None and self._compactor.is_alive():
+                return
+            snapshot = dict(self.records)
+            self._close_journal()
+            if os.path.exists(self.journal_file):
+                if os.path.exists(self.compacting_file):
+                    # An earlier compaction failed; keep its ops replayable
+                    with open(self.journal_file, "rb") as src, open(self.compacting_file, "ab") as dst:
+                        dst.write(src.read())
+                    os.remove(self.journal_file)
+                else:
+                    os.replace(self.journal_file, self.compacting_file)
+            self._journal_ops = 0
+            self._compactor = threading.Thread(
+                target=self._finish_compaction, args=(snapshot,), daemon=True
+            )
+            self._compactor.start()
+        if wait:
+            self._compactor.join()
+
+    def _finish_compaction(self, snapshot: Dict[str, Dict]):
+        try:
+            self._write_snapshot(snapshot)
+            if os.path.exists(self.compacting_file):
+                os.remove(self.compacting_file)
+        except Exception as e:
+            # The rotated journal is kept and replayed on the next load
+            print(f"Error compacting vault: {str(e)}")
+
+    def _write_snapshot(self, records: Dict[str, Dict]):
+        """Atomically replace the snapshot file."""
+        tmp_file = self.snapshot_file + ".tmp"
+        with open(tmp_file, "w") as f:
+            json.dump(records, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.snapshot_file)
+
+    def _close_journal(self):
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    def close(self):
+        """Wait for any running compaction and release the journal."""
+        if self._compactor is not None:
+            self._compactor.join()
+        with self.lock:
+            self._close_journal()
+
+
+class SQLiteVaultStorage:
+    """
+    Vault storage backed by a SQLite database in WAL mode.
+
+    Metadata lives in indexed columns next to the encrypted password, so
+    lookups, searches and category listings run as SQL queries instead of
+    over an in-memory copy of the vault. An existing JSON vault is migrated
+    into the database the first time it is opened.
+    """
+
+    SCHEMA_VERSION = 1
+
+    def __init__(self, db_file: str = "passwords.db", legacy_file: str = "passwords.json"):
+        self.db_file = db_file
+        self.legacy_file = legacy_file
+        self.lock = threading.RLock()
+        self.conn: Optional[sqlite3.Connection] = None
+        self._tx_depth = 0
+
+    def load(self):
+        """Open the database, creating the schema and migrating JSON data if needed."""
+        with self.lock:
+            if self.conn is None:
+                self.conn = sqlite3.connect(self.db_file, check_same_thread=False)
+                self.conn.execute("PRAGMA journal_mode=WAL")
+                self.conn.execute("PRAGMA synchronous=NORMAL")
+                self.conn.executescript("""
+                    CREATE TABLE IF NOT EXISTS entries (
+                        service TEXT NOT NULL UNIQUE,
+                        username TEXT NOT NULL,
+                        password TEXT NOT NULL,
+                        url TEXT NOT NULL DEFAULT '',
+                        category TEXT NOT NULL DEFAULT 'General',
+                        created_date REAL,
+                        last_modified REAL,
+                        search_key TEXT NOT NULL
+                    );
+                    CREATE INDEX IF NOT EXISTS idx_entries_category ON entries(category);
+                    CREATE INDEX IF NOT EXISTS idx_entries_username ON entries(username);
+                """)
+            version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+            if version < self.SCHEMA_VERSION:
+                self._migrate_legacy()
+
+    def _migrate_legacy(self):
+        """One-shot import of the JSON snapshot and journal."""
+        records = JournaledVaultStorage(self.legacy_file).load()
+        with self.transaction():
+            self._put_rows(records.items())
+            self.conn.execute(f"PRAGMA user_version={self.SCHEMA_VERSION}")
+
+    @staticmethod
+    def _search_key(service: str, record: Dict) -> str:
+        # Lowercased in Python so matching follows str.lower(), not SQLite's
+        # ASCII-only lower(); NUL separates fields so matches cannot span them.
+        return "\0".join((
+            service.lower(),
+            record["username"].lower(),
+            record.get("url", "").lower(),
+            record.get("category", "General").lower(),
+        ))
+
+    def _put_rows(self, items: Iterable[Tuple[str, Dict]]):
+        # Upsert keeps the rowid, so an updated entry keeps its position
+        self.conn.executemany("""
+            INSERT INTO entries (service, username, password, url, category,
+                                 created_date, last_modified, search_key)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(service) DO UPDATE SET
+                username=excluded.username, password=excluded.password,
+                url=excluded.url, category=excluded.category,
+                created_date=excluded.created_date,
+                last_modified=excluded.last_modified,
+                search_key=excluded.search_key
+        """, (
+            (
+                service,
+                record["username"],
+                record["password"],
+                record.get("url", ""),
+                record.get("category", "General"),
+                record.get("created_date", time.time()),
+                record.get("last_modified", time.time()),
+                self._search_key(service, record),
+            )
+            for service, record in items
+        ))
+
+    @staticmethod
+    def _row_to_record(row: Tuple) -> Dict:
+        return {
+            "username": row[0],
+            "password": row[1],
+            "url": row[2],
+            "category": row[3],
+            "created_date": row[4],
+            "last_modified": row[5],
+        }
+
+    _RECORD_COLUMNS = "username, password, url, category, created_date, last_modified"
+
+    def get(self, service: str) -> Optional[Dict]:
+        """Return the encrypted record for a service, if any."""
+        with self.lock:
+            row = self.conn.execute(
+                f"SELECT {self._RECORD_COLUMNS} FROM entries WHERE service = ?", (service,)
+            ).fetchone()
+        return self._row_to_record(row) if row else None
+
+    @contextmanager
+    def transaction(self):
+        """
+        Group writes into one transaction. Nested calls join the outer
+        transaction, which commits (or rolls back) when it exits.
+        """
+        with self.lock:
+            self._tx_depth += 1
+            try:
+                yield
+                if self._tx_depth == 1:
+                    self.conn.commit()
+            except BaseException:
+                if self._tx_depth == 1:
+                    self.conn.rollback()
+                raise
+            finally:
+                self._tx_depth -= 1
+
+    def put(self, service: str, record: Dict):
+        """Store the encrypted record for a service."""
+        self.put_many([(service, record)])
+
+    def put_many(self, items: Iterable[Tuple[str, Dict]]):
+        """Store many records in a single transaction."""
+        with self.transaction():
+            self._put_rows(items)
+
+    def delete(self, service: str):
+        """Remove a service from the vault."""
+        self.delete_many([service])
+
+    def delete_many(self, services: Iterable[str]):
+        """Remove many services in a single transaction."""
+        with self.transaction():
+            self.conn.executemany(
+                "DELETE FROM entries WHERE service = ?", ((service,) for service in services)
+            )
+
+    def apply(self, puts: Dict[str, Dict], deletes: Iterable[str]):
+        """Apply many puts and deletes in a single transaction."""
+        with self.transaction():
+            self.delete_many(deletes)
+            self._put_rows(puts.items())
+
+    def count(self) -> int:
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def services(self) -> Iterator[str]:
+        """Iterate over service names in vault order without loading them all."""
+        with self.lock:
+            cursor = self.conn.execute("SELECT service FROM entries ORDER BY rowid")
+            rows = cursor.fetchmany(1000)
+        while rows:
+            for row in rows:
+                yield row[0]
+            with self.lock:
+                rows = cursor.fetchmany(1000)
+
+    def iter_records(self) -> Iterator[Tuple[str, Dict]]:
+        """Yield (service, record) pairs in vault order, fetching in pages."""
+        with self.lock:
+            cursor = self.conn.execute(
+                f"SELECT service, {self._RECORD_COLUMNS} FROM entries ORDER BY rowid"
+            )
+            rows = cursor.fetchmany(1000)
+        while rows:
+            for row in rows:
+                yield row[0], self._row_to_record(row[1:])
+            with self.lock:
+                rows = cursor.fetchmany(1000)
+
+    def _search(self, columns: str, query: str, category: Optional[str]) -> List[Tuple]:
+        query = query.lower()
+        if "\0" in query:
+            return []
+        sql = f"SELECT {columns} FROM entries WHERE instr(search_key, ?) > 0"
+        params: list = [query]
+        if category is not None:
+            sql += " AND category = ?"
+            params.append(category)
+        sql += " ORDER BY rowid"
+        with self.lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    def search(self, query: str, category: Optional[str] = None) -> List[Tuple[str, Dict]]:
+        """
+        Return (service, record) pairs whose service, username, url or
+        category contains query (case-insensitive), optionally restricted
+        to one category, in vault order.
+        """
+        rows = self._search(f"service, {self._RECORD_COLUMNS}", query, category)
+        return [(row[0], self._row_to_record(row[1:])) for row in rows]
+
+    def search_services(self, query: str, category: Optional[str] = None) -> List[str]:
+        """Like search, but only returns the matching service names."""
+        return [row[0] for row in self._search("service", query, category)]
+
+    def categories(self) -> List[str]:
+        """Sorted list of categories in use, read from the category index."""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT DISTINCT category FROM entries ORDER BY category"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def close(self):
+        with self.lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
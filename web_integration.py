@@ -1,136 +1,35 @@
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
+from selenium.common.exceptions import TimeoutException
+from driver_pool import DriverPool
+from login_detection import ROLES, detect_login_fields, matches_role, resolve_locators
+from locator_cache import LocatorCache
+from login_probe import LoginFormProbe
 import threading
 import time
-import pyautogui
-import re
-import json
-import os
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from typing import Optional, Dict, Tuple
 
 class WebIntegration:
-    def __init__(self):
+    def __init__(self, pool: Optional[DriverPool] = None, locator_cache: Optional[LocatorCache] = None,
+                 probe: Optional[LoginFormProbe] = None):
+        self.pool = pool or DriverPool.shared()
+        # Static pages are resolved over plain HTTP before a browser is used
+        self.probe = probe or LoginFormProbe.shared()
         self.driver = None
         self.lock = threading.Lock()
-        self.known_sites_file = 'known_sites.json'
-        self.known_sites = self._load_known_sites()
-        
-    def _load_known_sites(self) -> Dict[str, Dict]:
-        """Load known website login patterns."""
-        if os.path.exists(self.known_sites_file):
-            with open(self.known_sites_file, 'r') as f:
-                return json.load(f)
-        return {
-            "github.com": {
-                "login_url": "https://github.com/login",
-                "username_field": {"id": "login_field"},
-                "password_field": {"id": "password"},
-                "submit_button": {"name": "commit"}
-            },
-            "google.com": {
-                "login_url": "https://accounts.google.com/signin",
-                "username_field": {"name": "identifier"},
-                "password_field": {"name": "password"},
-                "submit_button": {"id": "passwordNext"}
-            },
-            "facebook.com": {
-                "login_url": "https://www.facebook.com/login",
-                "username_field": {"id": "email"},
-                "password_field": {"id": "pass"},
-                "submit_button": {"name": "login"}
-            },
-            "twitter.com": {
-                "login_url": "https://twitter.com/login",
-                "username_field": {"name": "text"},
-                "password_field": {"name": "password"},
-                "submit_button": {"xpath": "//div[@data-testid='LoginForm_Login_Button']"}
-            },
-            "linkedin.com": {
-                "login_url": "https://www.linkedin.com/login",
-                "username_field": {"id": "username"},
-                "password_field": {"id": "password"},
-                "submit_button": {"xpath": "//button[@type='submit']"}
-            },
-            "instagram.com": {
-                "login_url": "https://www.instagram.com/accounts/login",
-                "username_field": {"name": "username"},
-                "password_field": {"name": "password"},
-                "submit_button": {"xpath": "//button[@type='submit']"}
-            },
-            "amazon.com": {
-                "login_url": "https://www.amazon.com/ap/signin",
-                "username_field": {"id": "ap_email"},
-                "password_field": {"id": "ap_password"},
-                "submit_button": {"id": "signInSubmit"}
-            },
-            "microsoft.com": {
-                "login_url": "https://login.live.com",
-                "username_field": {"name": "loginfmt"},
-                "password_field": {"name": "passwd"},
-                "submit_button": {"id": "idSIButton9"}
-            },
-            "reddit.com": {
-                "login_url": "https://www.reddit.com/login",
-                "username_field": {"id": "loginUsername"},
-                "password_field": {"id": "loginPassword"},
-                "submit_button": {"xpath": "//button[@type='submit']"}
-            },
-            "netflix.com": {
-                "login_url": "https://www.netflix.com/login",
-                "username_field": {"id": "id_userLoginId"},
-                "password_field": {"id": "id_password"},
-                "submit_button": {"xpath": "//button[@type='submit']"}
-            },
-            "spotify.com": {
-                "login_url": "https://accounts.spotify.com/login",
-                "username_field": {"id": "login-username"},
-                "password_field": {"id": "login-password"},
-                "submit_button": {"id": "login-button"}
-            },
-            "dropbox.com": {
-                "login_url": "https://www.dropbox.com/login",
-                "username_field": {"name": "login_email"},
-                "password_field": {"name": "login_password"},
-                "submit_button": {"xpath": "//button[@type='submit']"}
-            },
-            "yahoo.com": {
-                "login_url": "https://login.yahoo.com",
-                "username_field": {"id": "login-username"},
-                "password_field": {"id": "login-passwd"},
-                "submit_button": {"id": "login-signin"}
-            },
-            "twitch.tv": {
-                "login_url": "https://www.twitch.tv/login",
-                "username_field": {"id": "login-username"},
-                "password_field": {"id": "password-input"},
-                "submit_button": {"xpath": "//button[@data-a-target='passport-login-button']"}
-            },
-            "discord.com": {
-                "login_url": "https://discord.com/login",
-                "username_field": {"name": "email"},
-                "password_field": {"name": "password"},
-                "submit_button": {"xpath": "//button[@type='submit']"}
-            }
-        }
+        # Known website login patterns, shared with WebAutomation
+        self.locator_cache = locator_cache or LocatorCache.shared()
+        self.known_sites_file = self.locator_cache.cache_file
+        self.known_sites = self.locator_cache.sites
     
     def initialize_driver(self):
-        """Initialize the web driver with security settings."""
+        """Borrow a browser session from the pool as self.driver."""
         if not self.driver:
             try:
-                options = webdriver.ChromeOptions()
-                options.add_argument('--headless')  # Run in headless mode
-                options.add_argument('--disable-gpu')
-                options.add_argument('--no-sandbox')
-                options.add_argument('--disable-dev-shm-usage')
-                
-                service = Service(ChromeDriverManager().install())
-                self.driver = webdriver.Chrome(service=service, options=options)
-                self.driver.set_page_load_timeout(10)  # Reduced timeout
+                self.driver = self.pool.acquire()
                 return True
             except Exception as e:
                 print(f"Failed to initialize driver: {str(e)}")
@@ -138,148 +37,76 @@ class WebIntegration:
         return True
     
     def close_driver(self):
-        """Safely close the web driver."""
+        """Hand self.driver back to the pool."""
         with self.lock:
             if self.driver:
                 try:
-                    self.driver.quit()
-                except:
-                    pass
+                    self.pool.release(self.driver)
                 finally:
                     self.driver = None
     
     def learn_website(self, url: str) -> bool:
         """Learn login patterns for a new website."""
         try:
-            if not self.initialize_driver():
+            probed = self.probe.probe(url)
+            if probed.found and all(role in probed.locators for role in ROLES):
+                self.locator_cache.store(self.extract_domain(url), probed.locators, login_url=url)
+                return True
+            if not probed.needs_browser and not probed.found:
                 return False
+            
+            # A form whose fields have no reliable static locator is
+            # detected in the rendered page instead
+            with self.pool.session() as driver:
+                driver.get(url)
+                # Look for the username field, password field and submit button
+                candidates = detect_login_fields(driver)
+                found_elements = all(candidates)
+                if found_elements:
+                    self.locator_cache.store(
+                        self.extract_domain(url),
+                        {role: candidate["locator"] for role, candidate in zip(ROLES, candidates)},
+                        login_url=url)
                 
-            with self.lock:
-                self.driver.get(url)
-                # Look for common login form elements
-                found_elements = False
-                try:
-                    # Check for username/email field
-                    username_field = self.driver.find_element(By.CSS_SELECTOR, 
-                        'input[type="text"], input[type="email"], input[name="username"], input[name="email"]')
-                    # Check for password field
-                    password_field = self.driver.find_element(By.CSS_SELECTOR, 
-                        'input[type="password"]')
-                    # Check for submit button
-                    submit_button = self.driver.find_element(By.CSS_SELECTOR, 
-                        'button[type="submit"], input[type="submit"]')
-                    found_elements = True
-                except NoSuchElementException:
-                    found_elements = False
-                
-                self.close_driver()
                 return found_elements
                 
         except Exception as e:
             print(f"Error learning website: {str(e)}")
-            self.close_driver()
             return False
     
     def autofill_login(self, url: str, username: str, password: str) -> bool:
         """Auto-fill login credentials."""
         try:
-            if not self.initialize_driver():
-                return False
-                
-            with self.lock:
-                self.driver.get(url)
+            with self.pool.session() as driver:
+                driver.get(url)
                 
                 # Find and fill username
-                username_field = self.driver.find_element(By.CSS_SELECTOR, 
+                username_field = driver.find_element(By.CSS_SELECTOR, 
                     'input[type="text"], input[type="email"], input[name="username"], input[name="email"]')
                 username_field.send_keys(username)
                 
                 # Find and fill password
-                password_field = self.driver.find_element(By.CSS_SELECTOR, 
+                password_field = driver.find_element(By.CSS_SELECTOR, 
                     'input[type="password"]')
                 password_field.send_keys(password)
                 
                 # Find and click submit button
-                submit_button = self.driver.find_element(By.CSS_SELECTOR, 
+                submit_button = driver.find_element(By.CSS_SELECTOR, 
                     'button[type="submit"], input[type="submit"]')
                 submit_button.click()
                 
                 time.sleep(2)  # Brief wait to ensure form submission
-                self.close_driver()
                 return True
                 
         except Exception as e:
             print(f"Error auto-filling login: {str(e)}")
-            self.close_driver()
             return False
     
     def detect_login_fields(self) -> Tuple[Optional[Dict], Optional[Dict], Optional[Dict]]:
-        """Detect login fields on the current page."""
-        common_username_patterns = [
-            'username', 'email', 'login', 'user', 'id', 'phone',
-            'account', 'loginid', 'userid', 'user-name', 'username-or-email'
-        ]
-        common_password_patterns = [
-            'password', 'pass', 'pwd', 'passwd'
-        ]
-        
+        """Detect login fields on the current page with a single script call."""
         try:
-            # Try to find username field
-            username_field = None
-            # Check by type first
-            elements = self.driver.find_elements(By.XPATH, "//input[@type='email']")
-            if elements:
-                username_field = {'xpath': "//input[@type='email']"}
-            else:
-                for pattern in common_username_patterns:
-                    # Try ID
-                    elements = self.driver.find_elements(By.ID, pattern)
-                    if elements:
-                        username_field = {'id': pattern}
-                        break
-                    # Try name
-                    elements = self.driver.find_elements(By.NAME, pattern)
-                    if elements:
-                        username_field = {'name': pattern}
-                        break
-                    # Try contains
-                    elements = self.driver.find_elements(By.XPATH, 
-                        f"//input[contains(@id, '{pattern}') or contains(@name, '{pattern}')]")
-                    if elements:
-                        username_field = {'xpath': f"//input[contains(@id, '{pattern}') or contains(@name, '{pattern}')]"}
-                        break
-            
-            # Try to find password field
-            password_field = None
-            # First try type='password'
-            elements = self.driver.find_elements(By.XPATH, "//input[@type='password']")
-            if elements:
-                password_field = {'xpath': "//input[@type='password']"}
-            else:
-                for pattern in common_password_patterns:
-                    elements = self.driver.find_elements(By.XPATH, 
-                        f"//input[@type='password' and (contains(@id, '{pattern}') or contains(@name, '{pattern}'))]")
-                    if elements:
-                        password_field = {'xpath': f"//input[@type='password' and (contains(@id, '{pattern}') or contains(@name, '{pattern}'))]"}
-                        break
-            
-            # Try to find submit button
-            submit_button = None
-            submit_patterns = [
-                "//button[@type='submit']",
-                "//input[@type='submit']",
-                "//button[contains(@class, 'login')]",
-                "//button[contains(@class, 'signin')]",
-                "//button[contains(text(), 'Log')]",
-                "//button[contains(text(), 'Sign')]"
-            ]
-            for pattern in submit_patterns:
-                elements = self.driver.find_elements(By.XPATH, pattern)
-                if elements:
-                    submit_button = {'xpath': pattern}
-                    break
-            
-            return username_field, password_field, submit_button
+            candidates = detect_login_fields(self.driver)
+            return tuple(candidate["locator"] if candidate else None for candidate in candidates)
             
         except Exception as e:
             print(f"Error detecting login fields: {str(e)}")
@@ -287,172 +114,216 @@ class WebIntegration:
     
     def extract_domain(self, url: str) -> str:
         """Extract domain from URL."""
-        match = re.search(r'(?:https?://)?(?:www\.)?([^/]+)', url)
-        return match.group(1) if match else url
+        return LocatorCache.domain(url)
     
     def save_known_sites(self):
         """Save known website patterns."""
-        with open(self.known_sites_file, 'w') as f:
-            json.dump(self.known_sites, f, indent=4)
+        self.locator_cache.save()
 
 
-class WebAutomation:
+@dataclass
+class FormResult:
+    """Outcome of a WebAutomation call, with seconds spent per phase."""
+    success: bool
+    message: str
+    timings: Dict[str, float] = field(default_factory=dict)
+    # Detected locators by role, in the known_sites format
+    locators: Dict[str, Dict] = field(default_factory=dict)
+    # Whether the locators came from the locator cache
+    cache_hit: bool = False
+
+
+class PhaseTimer:
+    """Wall-clock seconds per phase, plus a running total."""
+    
     def __init__(self):
-        self.driver = None
-        self.lock = threading.Lock()
+        self.timings: Dict[str, float] = {}
+        self._start = self.phase_start = time.perf_counter()
     
-    def _create_driver(self):
-        """Create a new browser instance with optimal settings."""
+    def mark(self, name: str):
+        """Close the current phase under name and start the next one."""
+        now = time.perf_counter()
+        self.timings[name] = now - self.phase_start
+        self.timings["total"] = now - self._start
+        self.phase_start = now
+
+
+class WebAutomation:
+    def __init__(self, pool: Optional[DriverPool] = None, timeout: float = 10,
+                 locator_cache: Optional[LocatorCache] = None, probe: Optional[LoginFormProbe] = None,
+                 form_grace: float = 2):
+        # Each call borrows its own session, so calls no longer queue
+        # behind a single browser
+        self.pool = pool or DriverPool.shared()
+        # Static pages are resolved over plain HTTP before a browser is used
+        self.probe = probe or LoginFormProbe.shared()
+        # Locators that worked before, so known sites skip detection
+        self.locator_cache = locator_cache or LocatorCache.shared()
+        # Upper bound for each wait; waits end as soon as the page is ready
+        self.timeout = timeout
+        # How long test_login_form waits for a form after the page finished
+        # loading; pages without one should not cost the full timeout
+        self.form_grace = form_grace
+    
+    @contextmanager
+    def _session(self):
+        """Borrow a pooled browser session; yields None if none could be started."""
         try:
-            options = webdriver.ChromeOptions()
-            options.add_argument('--headless=new')  # Modern headless mode
-            options.add_argument('--disable-gpu')
-            options.add_argument('--no-sandbox')
-            options.add_argument('--disable-dev-shm-usage')
-            options.add_argument('--disable-notifications')
-            options.add_experimental_option('excludeSwitches', ['enable-logging'])
-            
-            service = Service(ChromeDriverManager().install())
-            driver = webdriver.Chrome(service=service, options=options)
-            driver.set_page_load_timeout(10)
-            driver.implicitly_wait(5)
-            return driver
+            driver = self.pool.acquire()
         except Exception as e:
             print(f"Failed to create driver: {str(e)}")
-            return None
+            yield None
+            return
+        try:
+            yield driver
+        finally:
+            self.pool.release(driver, self.pool.is_healthy(driver))
     
-    def _ensure_driver(self):
-        """Ensure we have a working driver."""
-        if not self.driver:
-            self.driver = self._create_driver()
-        return self.driver is not None
+    def _load(self, driver, url: str, form_timeout: Optional[float] = None) -> bool:
+        """
+        Open url and wait until a password input is present: up to timeout
+        for the page to finish loading, then up to form_timeout (default
+        timeout) for a script-rendered form to appear.
+        """
+        driver.get(url)
+        try:
+            WebDriverWait(driver, self.timeout).until(
+                lambda d: d.execute_script("return document.readyState") == "complete")
+            WebDriverWait(driver, self.timeout if form_timeout is None else form_timeout).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, "input[type='password']")))
+            return True
+        except TimeoutException:
+            return False
     
-    def _quit_driver(self):
-        """Safely quit the driver."""
+    def _cached_fields(self, driver, domain: str):
+        """
+        Resolve the cached locators of domain in one round-trip. Returns
+        (candidates, True) if the username and password fields are still
+        there, visible and of the right kind; a stale entry is invalidated.
+        """
+        site = self.locator_cache.get(domain)
+        if not site or not site.get("username_field") or not site.get("password_field"):
+            return None, False
+        candidates = resolve_locators(driver, site)
+        # A stale locator may land on another visible element; typing the
+        # password into anything but a password input would expose it
+        usable = all(candidate and candidate["visible"] for candidate in candidates[:2]) and all(
+            matches_role(candidate, role) for role, candidate in zip(ROLES, candidates) if candidate)
+        if usable:
+            return candidates, True
+        self.locator_cache.invalidate(domain)
+        return None, False
+    
+    def _wait_for_submit(self, driver, submitted_from):
+        """Wait until the form was submitted: the page changed or the field went away."""
+        url = driver.current_url
         try:
-            if self.driver:
-                self.driver.quit()
-        except:
+            WebDriverWait(driver, self.timeout).until(
+                lambda d: d.current_url != url or EC.staleness_of(submitted_from)(d))
+        except TimeoutException:
             pass
-        finally:
-            self.driver = None
     
-    def fill_login_form(self, url: str, username: str, password: str) -> tuple[bool, str]:
+    def fill_login_form(self, url: str, username: str, password: str) -> FormResult:
         """
         Attempt to fill a login form on a webpage.
-        Returns: (success, message)
+        Returns a FormResult timed per phase (session, load, detect, fill, submit).
         """
-        with self.lock:
+        timer = PhaseTimer()
+        timings = timer.timings
+        mark = timer.mark
+        domain = self.locator_cache.domain(url)
+        cache_hit = False
+        with self._session() as driver:
+            mark("session")
+            if driver is None:
+                return FormResult(False, "Failed to initialize browser", timings)
             try:
-                if not self._ensure_driver():
-                    return False, "Failed to initialize browser"
-                
-                # Load the page
-                self.driver.get(url)
-                time.sleep(2)  # Let the page load completely
+                # Load the page; done once the form is there, not after a fixed delay
+                found = self._load(driver, url)
+                mark("load")
+                if not found:
+                    return FormResult(False, "Could not find password field", timings)
                 
-                # Common selectors for login forms
-                username_selectors = [
-                    "input[type='email']",
-                    "input[type='text']",
-                    "input[name*='email']",
-                    "input[name*='user']",
-                    "input[id*='email']",
-                    "input[id*='user']"
-                ]
-                
-                password_selectors = [
-                    "input[type='password']",
-                    "input[name*='pass']",
-                    "input[id*='pass']"
-                ]
-                
-                submit_selectors = [
-                    "button[type='submit']",
-                    "input[type='submit']",
-                    "button[contains(text(), 'Sign')]",
-                    "button[contains(text(), 'Log')]"
-                ]
-                
-                # Try to find username field
-                username_field = None
-                for selector in username_selectors:
-                    try:
-                        username_field = self.driver.find_element(By.CSS_SELECTOR, selector)
-                        if username_field.is_displayed():
-                            break
-                    except:
-                        continue
-                
-                if not username_field:
-                    return False, "Could not find username field"
-                
-                # Try to find password field
-                password_field = None
-                for selector in password_selectors:
-                    try:
-                        password_field = self.driver.find_element(By.CSS_SELECTOR, selector)
-                        if password_field.is_displayed():
-                            break
-                    except:
-                        continue
-                
-                if not password_field:
-                    return False, "Could not find password field"
+                # Reuse the locators learned for this domain if they still
+                # match; otherwise one script call scores every candidate
+                candidates, cache_hit = self._cached_fields(driver, domain)
+                if cache_hit:
+                    self.locator_cache.record_hit(time.perf_counter() - timer.phase_start)
+                else:
+                    candidates = detect_login_fields(driver)
+                    self.locator_cache.record_detection(time.perf_counter() - timer.phase_start)
+                mark("detect")
+                username_candidate, password_candidate, submit = candidates
+                locators = {
+                    role: candidate["locator"]
+                    for role, candidate in zip(ROLES, candidates)
+                    if candidate
+                }
+                if not username_candidate or not username_candidate["visible"]:
+                    return FormResult(False, "Could not find username field", timings, locators, cache_hit)
+                if not password_candidate or not password_candidate["visible"]:
+                    return FormResult(False, "Could not find password field", timings, locators, cache_hit)
+                username_field = username_candidate["element"]
+                password_field = password_candidate["element"]
                 
                 # Fill in the credentials
+                wait = WebDriverWait(driver, self.timeout)
+                wait.until(EC.element_to_be_clickable(username_field))
                 username_field.clear()
                 username_field.send_keys(username)
-                time.sleep(0.5)
-                
+                wait.until(EC.element_to_be_clickable(password_field))
                 password_field.clear()
                 password_field.send_keys(password)
-                time.sleep(0.5)
+                mark("fill")
                 
-                # Try to find and click submit button
-                submit_button = None
-                for selector in submit_selectors:
-                    try:
-                        submit_button = self.driver.find_element(By.CSS_SELECTOR, selector)
-                        if submit_button.is_displayed():
-                            break
-                    except:
-                        continue
+                if not cache_hit:
+                    self.locator_cache.store(domain, locators, login_url=url)
                 
-                if submit_button:
-                    submit_button.click()
-                    time.sleep(2)  # Wait for form submission
-                    return True, "Login form filled successfully"
-                else:
-                    return True, "Form filled, but submit button not found"
+                # Click the submit button if one was detected
+                if submit and submit["visible"]:
+                    submit["element"].click()
+                    self._wait_for_submit(driver, password_field)
+                    mark("submit")
+                    return FormResult(True, "Login form filled successfully", timings, locators, cache_hit)
+                mark("submit")
+                return FormResult(True, "Form filled, but submit button not found", timings, locators, cache_hit)
                 
             except Exception as e:
-                return False, f"Error filling login form: {str(e)}"
-            finally:
-                self._quit_driver()
+                mark("error")
+                if cache_hit:
+                    # Don't keep locators that led to an error
+                    self.locator_cache.invalidate(domain)
+                return FormResult(False, f"Error filling login form: {str(e)}", timings)
     
-    def test_login_form(self, url: str) -> tuple[bool, str]:
+    def test_login_form(self, url: str) -> FormResult:
         """
         Test if a login form exists on the webpage.
-        Returns: (success, message)
+        Returns a FormResult timed per phase (probe, then session, load,
+        detect if the page needed a browser).
         """
-        with self.lock:
+        timer = PhaseTimer()
+        timings = timer.timings
+        probed = self.probe.probe(url)
+        timer.mark("probe")
+        if not probed.needs_browser:
+            return FormResult(probed.found, probed.message, timings, probed.locators)
+        
+        with self._session() as driver:
+            timer.mark("session")
+            if driver is None:
+                return FormResult(False, "Failed to initialize browser", timings)
             try:
-                if not self._ensure_driver():
-                    return False, "Failed to initialize browser"
-                
-                self.driver.get(url)
-                time.sleep(2)
+                found = self._load(driver, url, self.form_grace)
+                timer.mark("load")
                 
                 # Check for password field as it's most distinctive
-                password_field = self.driver.find_element(By.CSS_SELECTOR, "input[type='password']")
-                if password_field and password_field.is_displayed():
-                    return True, "Login form found"
-                return False, "No login form found"
+                password_candidate = detect_login_fields(driver)[1] if found else None
+                visible = password_candidate is not None and password_candidate["visible"]
+                timer.mark("detect")
+                if visible:
+                    return FormResult(True, "Login form found", timings)
+                return FormResult(False, "No login form found", timings)
                 
-            except NoSuchElementException:
-                return False, "No login form found"
             except Exception as e:
-                return False, f"Error testing login form: {str(e)}"
-            finally:
-                self._quit_driver()
+                timer.mark("error")
+                return FormResult(False, f"Error testing login form: {str(e)}", timings)